@@ -1,7 +1,11 @@
 from django.contrib import admin
 from django.contrib.auth.admin import UserAdmin as BaseUserAdmin
+from django.core.exceptions import ValidationError
+from django.db.models import Q
+from django.utils.html import format_html
 from django.utils.translation import gettext_lazy as _
-from .models import CustomUser, Organization, Member
+from .models import CustomUser, Organization, Member, AuditEvent, ProfileReport
+from .routers import is_sharded, member_shards
 
 
 # Register your models here
@@ -40,11 +44,102 @@ class OrganizationAdmin(admin.ModelAdmin):
     list_filter = ['created_at']
 
 
+class MemberShardFilter(admin.SimpleListFilter):
+    title = _('shard')
+    parameter_name = 'shard'
+
+    def lookups(self, request, model_admin):
+        return [(alias, alias) for alias in member_shards()]
+
+    def value(self):
+        return super().value() or member_shards()[0]
+
+    def choices(self, changelist):
+        # No "All": the changelist can only page through one database.
+        for lookup, title in self.lookup_choices:
+            yield {
+                'selected': self.value() == lookup,
+                'query_string': changelist.get_query_string({self.parameter_name: lookup}),
+                'display': title,
+            }
+
+    def queryset(self, request, queryset):
+        # Already bound to the shard by MemberAdmin.get_queryset()
+        return queryset
+
+
 @admin.register(Member)
 class MemberAdmin(admin.ModelAdmin):
     list_display = ['user', 'organization', 'is_admin', 'joined_at']
     search_fields = ['user__email', 'organization__name']
     list_filter = ['is_admin', 'joined_at']
+    # Users and organizations live on default, so no joins from a shard.
+    list_select_related = ()
+
+    def get_list_filter(self, request):
+        if is_sharded():
+            return [MemberShardFilter, *self.list_filter]
+        return self.list_filter
+
+    def get_queryset(self, request):
+        shards = member_shards()
+        alias = request.GET.get(MemberShardFilter.parameter_name)
+        return super().get_queryset(request).using(alias if alias in shards else shards[0])
+
+    def get_object(self, request, object_id, from_field=None):
+        try:
+            return Member.objects.get_from_any_shard(pk=object_id)
+        except (Member.DoesNotExist, ValueError, ValidationError):
+            return None
+
+    def get_search_results(self, request, queryset, search_term):
+        if not search_term:
+            return queryset, False
+        # Resolve the names on default, then filter the shard by id.
+        user_ids = CustomUser.objects.filter(email__icontains=search_term).values_list('id', flat=True)
+        organization_ids = Organization.objects.filter(name__icontains=search_term).values_list('id', flat=True)
+        return queryset.filter(Q(user_id__in=list(user_ids)) | Q(organization_id__in=list(organization_ids))), False
+
+
+@admin.register(AuditEvent)
+class AuditEventAdmin(admin.ModelAdmin):
+    list_display = ['action', 'actor', 'organization_id', 'member_id', 'created_at']
+    search_fields = ['actor__email']
+    list_filter = ['action', 'created_at']
+    readonly_fields = ['action', 'actor', 'organization_id', 'member_id', 'details', 'created_at']
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+
+@admin.register(ProfileReport)
+class ProfileReportAdmin(admin.ModelAdmin):
+    list_display = ['method', 'path', 'status_code', 'duration_ms', 'query_count', 'query_time_ms', 'user', 'created_at']
+    search_fields = ['path']
+    list_filter = ['method', 'status_code']
+    fields = [
+        'user', 'method', 'path', 'status_code', 'duration_ms', 'query_count', 'query_time_ms',
+        'created_at', 'sql', 'profile',
+    ]
+    readonly_fields = fields
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+    @admin.display(description='SQL')
+    def sql(self, obj):
+        lines = [f"[{q['alias']}] {q['duration_ms']:.3f} ms  {q['sql']}" for q in obj.queries]
+        return format_html('<pre>{}</pre>', "\n".join(lines))
+
+    @admin.display(description='Profile')
+    def profile(self, obj):
+        return format_html('<pre>{}</pre>', obj.stats)
 
 
 # Register CustomUser with custom admin
@@ -0,0 +1,136 @@
+"""
+Buffered audit log for membership and organization changes.
+
+Views call ``audit_log.record(...)`` which only appends an unsaved
+AuditEvent to an in-process buffer. A daemon thread writes the buffer with
+one ``bulk_create`` whenever it reaches AUDIT_LOG['BATCH_SIZE'] events or
+AUDIT_LOG['FLUSH_INTERVAL'] seconds have passed, and whatever is left is
+flushed at interpreter exit (and from gunicorn's worker_exit hook).
+
+The buffer holds at most AUDIT_LOG['MAX_PENDING'] events (by default ten
+batches). If the database stays unreachable past that, the oldest events
+are dropped with a warning rather than growing without bound.
+"""
+
+import atexit
+import logging
+import os
+import threading
+
+from django.conf import settings
+from django.db import connection
+from django.utils import timezone
+
+from .models import AuditEvent
+
+logger = logging.getLogger(__name__)
+
+DEFAULTS = {
+    'BATCH_SIZE': 100,
+    'FLUSH_INTERVAL': 2.0,
+    'MAX_PENDING': None,  # 10 * BATCH_SIZE
+}
+
+
+class AuditLog:
+    def __init__(self, batch_size=None, flush_interval=None, background=True, max_pending=None):
+        options = {**DEFAULTS, **getattr(settings, 'AUDIT_LOG', {})}
+        self.batch_size = batch_size or options['BATCH_SIZE']
+        self.flush_interval = flush_interval or options['FLUSH_INTERVAL']
+        self.max_pending = max_pending or options['MAX_PENDING'] or 10 * self.batch_size
+        self.background = background
+        self._reset()
+
+    def _reset(self):
+        # Also called in a forked child: the parent's thread and lock state
+        # do not survive fork, and its pending events belong to the parent.
+        self._pid = os.getpid()
+        self._lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._pending = []
+        self._worker = None
+
+    def _check_fork(self):
+        if self._pid != os.getpid():
+            self._reset()
+
+    def record(self, action, actor=None, organization_id=None, member_id=None, **details):
+        event = AuditEvent(
+            action=action,
+            actor_id=getattr(actor, 'pk', actor),
+            organization_id=organization_id,
+            member_id=member_id,
+            details=details,
+            created_at=timezone.now(),
+        )
+        self._check_fork()
+        with self._lock:
+            self._pending.append(event)
+            dropped = self._trim()
+            full = len(self._pending) >= self.batch_size
+        self._warn_dropped(dropped)
+        if self.background:
+            self._ensure_worker()
+            if full:
+                self._wakeup.set()
+        elif full:
+            self.flush()
+
+    def flush(self):
+        """Writes every pending event and returns how many were written."""
+        self._check_fork()
+        with self._lock:
+            events, self._pending = self._pending, []
+        if not events:
+            return 0
+        try:
+            AuditEvent.objects.bulk_create(events, batch_size=self.batch_size)
+        except Exception:
+            # Keep the events for the next attempt, ahead of newer ones.
+            with self._lock:
+                self._pending[:0] = events
+                dropped = self._trim()
+            self._warn_dropped(dropped)
+            raise
+        return len(events)
+
+    def _trim(self):
+        # Called with the lock held; drops the oldest events over the cap.
+        dropped = len(self._pending) - self.max_pending
+        if dropped <= 0:
+            return 0
+        del self._pending[:dropped]
+        return dropped
+
+    def _warn_dropped(self, dropped):
+        if dropped:
+            logger.warning("Audit buffer full (%d events); dropped %d oldest events", self.max_pending, dropped)
+
+    def _ensure_worker(self):
+        if self._worker is not None and self._worker.is_alive():
+            return
+        with self._lock:
+            if self._worker is None or not self._worker.is_alive():
+                self._worker = threading.Thread(target=self._run, name='audit-log-flusher', daemon=True)
+                self._worker.start()
+
+    def _run(self):
+        while True:
+            self._wakeup.wait(self.flush_interval)
+            self._wakeup.clear()
+            try:
+                self.flush()
+            except Exception:
+                logger.exception("Failed to flush audit events")
+                connection.close()
+
+
+audit_log = AuditLog()
+
+
+@atexit.register
+def _flush_on_exit():
+    try:
+        audit_log.flush()
+    except Exception:
+        logger.exception("Failed to flush audit events at exit")
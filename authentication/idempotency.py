@@ -0,0 +1,146 @@
+"""
+Idempotency-Key support for create endpoints.
+
+Decorate an APIView handler with ``@idempotent``. When a request carries an
+``Idempotency-Key`` header, the first request claims an IdempotencyRecord
+for (user, endpoint, key) and stores the response it produced. Anonymous
+requests such as signup are scoped by client address (REMOTE_ADDR) instead
+of user. Retries
+with the same key get that response back (with ``Idempotent-Replayed:
+true``) without running the handler again. Only successful responses are
+stored; after a failure the key is released and a retry runs the handler. A retry that arrives while the
+first request is still running waits for it instead of repeating the work.
+
+Records expire after IDEMPOTENCY['TTL'] seconds; remove them with
+``manage.py prune_idempotency_keys``.
+"""
+
+import functools
+import hashlib
+import json
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.utils import timezone
+from django.utils.crypto import salted_hmac
+from rest_framework.response import Response
+
+from .models import IdempotencyRecord
+
+HEADER = 'Idempotency-Key'
+SALT = 'authentication.idempotency'
+
+DEFAULTS = {
+    'TTL': 24 * 60 * 60,
+    # A record still in progress after this long was left by a dead worker.
+    'LOCK_TIMEOUT': 60,
+    # How long a concurrent duplicate waits for the first request.
+    'WAIT_TIMEOUT': 10,
+}
+
+
+def _option(name):
+    return {**DEFAULTS, **getattr(settings, 'IDEMPOTENCY', {})}[name]
+
+
+def _sha256(value):
+    return hashlib.sha256(value.encode()).hexdigest()
+
+
+def _fingerprint(request):
+    data = request.data
+    if hasattr(data, 'lists'):  # QueryDict from form posts
+        data = dict(data.lists())
+    # Keyed with SECRET_KEY: request bodies include passwords, and a plain
+    # hash of one could be brute-forced from the stored fingerprint.
+    return salted_hmac(SALT, json.dumps(data, sort_keys=True, default=str), algorithm='sha256').hexdigest()
+
+
+def _claim(key, scope, user_id, endpoint, fingerprint):
+    """Returns (record, True) if this request claimed the key, else (existing record, False)."""
+    key_hash = _sha256(json.dumps([scope, endpoint, key]))
+    now = timezone.now()
+    record = IdempotencyRecord.objects.filter(key_hash=key_hash).first()
+    if record is not None:
+        stale = record.in_progress and record.created_at <= now - timedelta(seconds=_option('LOCK_TIMEOUT'))
+        if record.expires_at <= now or stale:
+            IdempotencyRecord.objects.filter(pk=record.pk).delete()
+        else:
+            return record, False
+    try:
+        with transaction.atomic():
+            return IdempotencyRecord.objects.create(
+                key_hash=key_hash, key=key, user_id=user_id, endpoint=endpoint, fingerprint=fingerprint,
+                created_at=now, expires_at=now + timedelta(seconds=_option('TTL')),
+            ), True
+    except IntegrityError:
+        # Another request claimed it between the lookup and the insert.
+        return IdempotencyRecord.objects.get(key_hash=key_hash), False
+
+
+def _wait_for(record):
+    """Polls until the first request stores its response; None on timeout."""
+    deadline = time.monotonic() + _option('WAIT_TIMEOUT')
+    delay = 0.05
+    while record.in_progress:
+        if time.monotonic() >= deadline:
+            return None
+        time.sleep(delay)
+        delay = min(delay * 2, 1.0)
+        record = IdempotencyRecord.objects.filter(pk=record.pk).first()
+        if record is None:
+            # The first request failed and released the key.
+            return None
+    return record
+
+
+def _succeeded(response):
+    return response.status_code < 400 and isinstance(response.data, dict) and response.data.get('success') == 1
+
+
+def _error(message, status):
+    return Response({"success": 0, "message": message, "data": {}}, status=status)
+
+
+def idempotent(handler):
+    @functools.wraps(handler)
+    def wrapper(self, request, *args, **kwargs):
+        key = request.headers.get(HEADER)
+        if not key:
+            return handler(self, request, *args, **kwargs)
+        if len(key) > 255:
+            return _error(f"{HEADER} must be at most 255 characters.", 400)
+
+        user_id = request.user.pk if request.user.is_authenticated else None
+        scope = user_id if user_id is not None else 'ip:' + request.META.get('REMOTE_ADDR', '')
+        match = request.resolver_match
+        endpoint = match.url_name if match and match.url_name else type(self).__name__
+        fingerprint = _fingerprint(request)
+
+        record, claimed = _claim(key, scope, user_id, endpoint, fingerprint)
+        if not claimed:
+            if record.fingerprint != fingerprint:
+                return _error(f"{HEADER} was already used for a different request.", 422)
+            record = _wait_for(record)
+            if record is None:
+                return _error(f"A request with this {HEADER} is still in progress.", 409)
+            return Response(record.response_data, status=record.status_code, headers={'Idempotent-Replayed': 'true'})
+
+        try:
+            response = handler(self, request, *args, **kwargs)
+        except Exception:
+            record.delete()
+            raise
+        if not isinstance(response, Response) or not _succeeded(response):
+            # The views report failures, transient ones included, as
+            # success 0 with HTTP 200; let the client retry for real.
+            record.delete()
+        else:
+            record.status_code = response.status_code
+            record.response_data = response.data
+            record.save(update_fields=['status_code', 'response_data'])
+        return response
+
+    return wrapper
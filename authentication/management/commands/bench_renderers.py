@@ -0,0 +1,56 @@
+import gzip
+import time
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+from rest_framework.renderers import JSONRenderer
+
+from authentication.renderers import ColumnarJSONRenderer, MessagePackRenderer, msgpack
+
+
+class Command(BaseCommand):
+    help = "Compare encode time and response size of the list renderers on an organization listing."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, default=10000, help="Rows in the rendered envelope.")
+        parser.add_argument('--repeat', type=int, default=5, help="Timed runs per renderer, best one is reported.")
+
+    def handle(self, *args, **options):
+        created_at = timezone.now().isoformat().replace('+00:00', 'Z')
+        # Same shape as OrganizationListAPIView's response
+        envelope = {"success": 1, "message": "Organizations fetched successfully", "data": [
+            {
+                "id": i,
+                "name": f"Organization {i}",
+                "description": "Imported from the partner directory",
+                "created_by": {
+                    "id": i % 500, "email": f"owner{i % 500}@example.com", "full_name": f"Owner {i % 500}",
+                    "is_active": True, "is_staff": False,
+                },
+                "created_at": created_at,
+            }
+            for i in range(options['rows'])
+        ]}
+
+        renderers = [JSONRenderer(), ColumnarJSONRenderer()]
+        if msgpack is not None:
+            renderers.append(MessagePackRenderer())
+        else:
+            self.stdout.write("msgpack is not installed; skipping MessagePackRenderer.")
+
+        baseline = None
+        for renderer in renderers:
+            best = float('inf')
+            for _ in range(options['repeat']):
+                start = time.perf_counter()
+                body = renderer.render(envelope)
+                best = min(best, time.perf_counter() - start)
+            start = time.perf_counter()
+            compressed = gzip.compress(body, compresslevel=6)
+            gzip_time = time.perf_counter() - start
+            baseline = baseline or (best, len(body))
+            self.stdout.write(
+                f"{renderer.media_type:38} encode {best * 1000:7.1f} ms ({baseline[0] / best:4.1f}x)  "
+                f"{len(body):>10,} bytes ({len(body) / baseline[1]:5.0%})  "
+                f"gzip {len(compressed):>9,} bytes in {gzip_time * 1000:6.1f} ms"
+            )
@@ -0,0 +1,89 @@
+import heapq
+import time
+from contextlib import ExitStack
+from operator import attrgetter
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DEFAULT_DB_ALIAS, transaction
+from rest_framework.renderers import JSONRenderer
+
+from authentication.models import CustomUser, Organization, Member
+from authentication.routers import is_sharded, member_shards
+from authentication.serializers import FastOrganizationSerializer, FastMemberSerializer
+
+
+class Command(BaseCommand):
+    help = "Compare rows per second of the list serializers against their fast read-only versions."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, default=5000, help="Number of rows to create for the run.")
+        parser.add_argument('--repeat', type=int, default=5, help="Timed runs per serializer, best one is reported.")
+
+    def handle(self, *args, **options):
+        rows = options['rows']
+        repeat = options['repeat']
+        aliases = list(dict.fromkeys([DEFAULT_DB_ALIAS, *member_shards()]))
+
+        # Fixture rows are rolled back so the benchmark never touches real data.
+        with ExitStack() as stack:
+            for alias in aliases:
+                stack.enter_context(transaction.atomic(using=alias))
+            self._create_fixtures(rows)
+            for fast_class in (FastOrganizationSerializer, FastMemberSerializer):
+                # A fresh queryset per run so neither side reuses the result cache.
+                queryset = lambda: self._queryset(fast_class.model)
+                slow = self._best(lambda: fast_class.serializer_class(self._instances(queryset()), many=True).data, repeat)
+                fast = self._best(lambda: fast_class(queryset()).data, repeat)
+
+                renderer = JSONRenderer()
+                if renderer.render(fast_class.serializer_class(self._instances(queryset()), many=True).data) != \
+                        renderer.render(fast_class(queryset()).data):
+                    raise CommandError(f"{fast_class.__name__} output differs from {fast_class.serializer_class.__name__}")
+
+                count = self._count(queryset())
+                self.stdout.write(
+                    f"{fast_class.serializer_class.__name__}: {count / slow:,.0f} rows/s | "
+                    f"{fast_class.__name__}: {count / fast:,.0f} rows/s | "
+                    f"speedup {slow / fast:.1f}x"
+                )
+            for alias in aliases:
+                transaction.set_rollback(True, using=alias)
+
+    def _queryset(self, model):
+        queryset = model.objects.order_by('id')
+        # Members are read from every shard, as MemberListAPIView does.
+        return queryset.on_each_shard() if model is Member else queryset
+
+    def _instances(self, queryset):
+        if isinstance(queryset, list):
+            return list(heapq.merge(*queryset, key=attrgetter('id')))
+        return queryset
+
+    def _count(self, queryset):
+        if isinstance(queryset, list):
+            return sum(shard.count() for shard in queryset)
+        return queryset.count()
+
+    def _create_fixtures(self, rows):
+        owner = CustomUser.objects.create_user(email="bench-owner@example.com", password="bench1234")
+        users = CustomUser.objects.bulk_create(
+            CustomUser(email=f"bench-{i}@example.com", full_name=f"Bench {i}") for i in range(rows)
+        )
+        orgs = Organization.objects.bulk_create(
+            Organization(name=f"bench-org-{i}", created_by=owner) for i in range(rows)
+        )
+        members = [Member(user=user, organization=org) for user, org in zip(users, orgs)]
+        if is_sharded():
+            # Member.save() picks the shard and an id unique across shards.
+            for member in members:
+                member.save()
+        else:
+            Member.objects.using(DEFAULT_DB_ALIAS).bulk_create(members)
+
+    def _best(self, func, repeat):
+        timings = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            func()
+            timings.append(time.perf_counter() - start)
+        return min(timings)
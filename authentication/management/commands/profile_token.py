@@ -0,0 +1,18 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from authentication.models import CustomUser
+from authentication.profiling import make_token
+
+
+class Command(BaseCommand):
+    help = "Print a signed X-Profile token that profiles requests for a staff user."
+
+    def add_arguments(self, parser):
+        parser.add_argument('email', help="Email of the staff user the token is issued to.")
+
+    def handle(self, *args, **options):
+        try:
+            user = CustomUser.objects.get(email=options['email'], is_staff=True, is_active=True)
+        except CustomUser.DoesNotExist:
+            raise CommandError(f"No active staff user with email {options['email']}.")
+        self.stdout.write(make_token(user))
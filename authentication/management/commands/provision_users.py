@@ -0,0 +1,33 @@
+import csv
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+
+from authentication.provisioning import provision_users
+
+
+class Command(BaseCommand):
+    help = "Create users in bulk from a CSV file with email, full_name and password columns."
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help="CSV file with a header row.")
+        parser.add_argument('--chunk-size', type=int, default=1000, help="Rows validated and inserted together.")
+        parser.add_argument('--workers', type=int, default=None, help="Hashing processes (default: CPU count).")
+        parser.add_argument('--quiet', action='store_true', help="Only print rows that were not created.")
+
+    def handle(self, *args, **options):
+        try:
+            handle = open(options['path'], newline='', encoding='utf-8')
+        except OSError as e:
+            raise CommandError(str(e))
+
+        counts = {}
+        with handle:
+            for result in provision_users(csv.DictReader(handle), options['chunk_size'], options['workers']):
+                counts[result['status']] = counts.get(result['status'], 0) + 1
+                if not options['quiet'] or result['status'] != 'created':
+                    self.stdout.write(json.dumps(result))
+
+        self.stdout.write(self.style.SUCCESS(
+            ", ".join(f"{status}: {count}" for status, count in sorted(counts.items())) or "No rows."
+        ))
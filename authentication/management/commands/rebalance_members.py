@@ -0,0 +1,49 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections, transaction
+
+from authentication.models import Member
+from authentication.routers import member_databases, member_shards, shard_for
+
+
+class Command(BaseCommand):
+    help = "Move Member rows to the shard MEMBER_SHARDS assigns to their organization."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--chunk-size', type=int, default=1000, help="Rows moved per transaction.")
+        parser.add_argument('--dry-run', action='store_true', help="Only report how many rows would move.")
+
+    def handle(self, *args, **options):
+        table = Member._meta.db_table
+        for alias in member_shards():
+            if table not in connections[alias].introspection.table_names():
+                raise CommandError(f"Shard '{alias}' has no {table} table; run `migrate --database {alias}` first.")
+
+        total = 0
+        for alias in member_databases():
+            if table not in connections[alias].introspection.table_names():
+                continue
+            moves = {}
+            for pk, organization_id in Member.objects.using(alias).values_list('pk', 'organization_id').iterator():
+                target = shard_for(organization_id)
+                if target != alias:
+                    moves.setdefault(target, []).append(pk)
+
+            for target, pks in moves.items():
+                self.stdout.write(f"{alias} -> {target}: {len(pks)} rows")
+                total += len(pks)
+                if options['dry_run']:
+                    continue
+                for start in range(0, len(pks), options['chunk_size']):
+                    self._move(alias, target, pks[start:start + options['chunk_size']])
+
+        verb = "Would move" if options['dry_run'] else "Moved"
+        self.stdout.write(self.style.SUCCESS(f"{verb} {total} member rows."))
+
+    def _move(self, source, target, pks):
+        # Copy before deleting; ignore_conflicts makes a rerun after a crash
+        # between the two steps safe.
+        members = list(Member.objects.using(source).filter(pk__in=pks))
+        with transaction.atomic(using=target):
+            Member.objects.using(target).bulk_create(members, ignore_conflicts=True)
+        with transaction.atomic(using=source):
+            Member.objects.using(source).filter(pk__in=pks).delete()
@@ -0,0 +1,113 @@
+import json
+import os
+import subprocess
+import sys
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+
+# Runs in a fresh interpreter so every import and first request is cold.
+CHILD_SCRIPT = r"""
+import json, os, sys, time
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'div.settings')
+
+start = time.perf_counter()
+import django
+django.setup()
+from django.conf import settings
+settings.WARMUP_ON_STARTUP = {warm_up!r}
+from div.wsgi import application
+boot = time.perf_counter() - start
+
+from django.test import Client
+from div.warmup import iter_endpoints
+
+# Authenticate as the given user, else any active staff user, so protected
+# endpoints measure the view rather than the JWT rejection path.
+from django.contrib.auth import get_user_model
+from rest_framework_simplejwt.tokens import AccessToken
+users = get_user_model().objects.filter(is_active=True)
+if {email!r}:
+    user = users.get(email={email!r})
+else:
+    user = users.filter(is_staff=True).order_by('pk').first()
+headers = {{}}
+if user is not None:
+    headers['HTTP_AUTHORIZATION'] = 'Bearer ' + str(AccessToken.for_user(user))
+
+client = Client(HTTP_HOST='localhost', **headers)
+endpoints = []
+for name, path, view_class in iter_endpoints():
+    # Only read-only or input-less calls: GET where the view has one, else
+    # an empty POST which fails validation before any write.
+    method = client.get if hasattr(view_class, 'get') else client.post
+    timings = []
+    for _ in range(2):
+        t = time.perf_counter()
+        status = method(path).status_code
+        timings.append(time.perf_counter() - t)
+    endpoints.append({{'name': name, 'path': path, 'status': status, 'first': timings[0], 'second': timings[1]}})
+
+print(json.dumps({{'boot': boot, 'user': user.email if user else None, 'endpoints': endpoints}}))
+"""
+
+
+class Command(BaseCommand):
+    help = "Report import time per module and first-request latency per endpoint for a cold worker."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--top', type=int, default=25, help="Number of slowest modules to list.")
+        parser.add_argument('--no-warmup', action='store_true', help="Boot without running div.warmup.")
+        parser.add_argument('--email', help="Authenticate requests as this user (default: the first active staff user).")
+        parser.add_argument('--json', action='store_true', help="Print the raw report as JSON.")
+
+    def handle(self, *args, **options):
+        script = CHILD_SCRIPT.format(
+            warm_up=not options['no_warmup'] and getattr(settings, 'WARMUP_ON_STARTUP', False),
+            email=options['email'] or '',
+        )
+        result = subprocess.run(
+            [sys.executable, '-X', 'importtime', '-c', script],
+            capture_output=True, text=True, cwd=settings.BASE_DIR, env=os.environ.copy(),
+        )
+        if result.returncode != 0:
+            raise CommandError(result.stderr.strip().splitlines()[-1] if result.stderr else "Child process failed")
+
+        report = json.loads(result.stdout.strip().splitlines()[-1])
+        report['modules'] = self._parse_importtime(result.stderr)[:options['top']]
+
+        if options['json']:
+            self.stdout.write(json.dumps(report, indent=2))
+            return
+
+        self.stdout.write(f"Boot (django.setup + div.wsgi): {report['boot'] * 1000:.1f} ms")
+        self.stdout.write("\nSlowest imports (cumulative):")
+        for module in report['modules']:
+            self.stdout.write(f"  {module['cumulative'] * 1000:8.1f} ms  {module['self'] * 1000:8.1f} ms self  {module['name']}")
+        if report['user'] is None:
+            self.stdout.write(self.style.WARNING(
+                "\nNo active staff user found and no --email given: requests are unauthenticated."
+            ))
+        self.stdout.write(f"\nEndpoints as {report['user'] or 'anonymous'} (first request / second request):")
+        for endpoint in report['endpoints']:
+            # 401/403 only time authentication or permission rejection
+            note = "  (rejected before the view; not measured)" if endpoint['status'] in (401, 403) else ""
+            self.stdout.write(
+                f"  {endpoint['first'] * 1000:8.1f} ms  {endpoint['second'] * 1000:8.1f} ms  "
+                f"[{endpoint['status']}] {endpoint['name']} {endpoint['path']}{note}"
+            )
+
+    def _parse_importtime(self, stderr):
+        # Lines look like: "import time:       120 |        450 |   django.db"
+        modules = []
+        for line in stderr.splitlines():
+            if not line.startswith('import time:') or 'cumulative' in line:
+                continue
+            self_us, cumulative_us, name = line[len('import time:'):].split('|')
+            modules.append({
+                'name': name.strip(),
+                'self': int(self_us) / 1e6,
+                'cumulative': int(cumulative_us) / 1e6,
+            })
+        return sorted(modules, key=lambda m: m['cumulative'], reverse=True)
@@ -0,0 +1,16 @@
+from django.conf import settings
+from django.middleware.gzip import GZipMiddleware
+
+
+class LargeResponseGZipMiddleware(GZipMiddleware):
+    """
+    GZipMiddleware that leaves bodies under GZIP_MIN_LENGTH bytes alone:
+    for the small single-object envelopes compressing costs more CPU than
+    it saves on the wire.
+    """
+
+    def process_response(self, request, response):
+        min_length = getattr(settings, 'GZIP_MIN_LENGTH', 1024)
+        if not response.streaming and len(response.content) < min_length:
+            return response
+        return super().process_response(request, response)
@@ -0,0 +1,32 @@
+# Generated by Django 5.2.3 on 2026-10-19 13:05
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('authentication', '0002_rename_organization_member_organization_and_more'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AuditEvent',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('action', models.CharField(choices=[('member.added', 'Member added'), ('member.updated', 'Member updated'), ('member.removed', 'Member removed'), ('organization.updated', 'Organization updated'), ('organization.deleted', 'Organization deleted')], max_length=32)),
+                ('organization_id', models.BigIntegerField(null=True)),
+                ('member_id', models.BigIntegerField(null=True)),
+                ('details', models.JSONField(blank=True, default=dict)),
+                ('created_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('actor', models.ForeignKey(null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='audit_events', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'ordering': ['-created_at'],
+                'indexes': [models.Index(fields=['organization_id', 'created_at'], name='authenticat_organiz_94d476_idx'), models.Index(fields=['created_at'], name='authenticat_created_c0b482_idx')],
+            },
+        ),
+    ]
@@ -1,7 +1,15 @@
-from django.db import models
+import os
+import threading
+
+from django.db import DEFAULT_DB_ALIAS, IntegrityError, models, transaction
+from django.db.models import F, Max
 from django.contrib.auth.models import AbstractBaseUser, PermissionsMixin, BaseUserManager
+from django.core.exceptions import NON_FIELD_ERRORS, ValidationError
+from django.core.serializers.json import DjangoJSONEncoder
 from django.utils import timezone
 
+from .routers import is_sharded, member_shards, shard_for
+
 
 # Custom User Manager
 class CustomUserManager(BaseUserManager):
@@ -55,16 +63,235 @@ class Organization(models.Model):
         return self.name
 
 
+# Shard Sequence Model
+class ShardSequenceManager(models.Manager):
+    def reserve(self, name, size, initial):
+        """
+        Reserves ``size`` consecutive values of the named sequence and returns
+        the first one. ``initial`` is called to seed a sequence seen for the
+        first time.
+        """
+        with transaction.atomic(using=DEFAULT_DB_ALIAS):
+            # Writing first takes the lock, so concurrent callers serialize.
+            if self.filter(name=name).update(next_value=F('next_value') + size):
+                return self.get(name=name).next_value - size
+            try:
+                with transaction.atomic(using=DEFAULT_DB_ALIAS):
+                    start = initial()
+                    self.create(name=name, next_value=start + size)
+                    return start
+            except IntegrityError:
+                pass
+        return self.reserve(name, size, initial)
+
+
+class ShardSequence(models.Model):
+    name = models.CharField(max_length=100, unique=True)
+    next_value = models.BigIntegerField()
+
+    objects = ShardSequenceManager()
+
+    def __str__(self):
+        return f"{self.name} ({self.next_value})"
+
+
+class _MemberIdBlock:
+    """
+    Hands out Member primary keys from blocks reserved on default, so ids
+    stay unique across shards at one UPDATE per ``size`` inserts.
+    """
+
+    size = 100
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._pid = None
+        self._next = self._end = 0
+
+    def next(self):
+        with self._lock:
+            # A forked child must not reuse its parent's block.
+            if self._pid != os.getpid() or self._next >= self._end:
+                self._pid = os.getpid()
+                self._next = ShardSequence.objects.reserve('member', self.size, self._initial)
+                self._end = self._next + self.size
+            value = self._next
+            self._next += 1
+            return value
+
+    def _initial(self):
+        aliases = set(member_shards()) | {DEFAULT_DB_ALIAS}
+        return max(Member.objects.using(alias).aggregate(Max('id'))['id__max'] or 0 for alias in aliases) + 1
+
+
+_member_ids = _MemberIdBlock()
+
+
 # Member Model
+class MemberQuerySet(models.QuerySet):
+    def create(self, **kwargs):
+        if not is_sharded():
+            return super().create(**kwargs)
+        # Member.save() picks the shard; the router has nothing to go on here.
+        member = self.model(**kwargs)
+        member.save(force_insert=True)
+        return member
+
+    def for_organization(self, organization_id):
+        """Members of one organization, read from its shard only."""
+        return self.using(shard_for(organization_id)).filter(organization_id=organization_id)
+
+    def on_each_shard(self):
+        """This queryset bound to every active shard, for scatter-gather."""
+        return [self.using(alias) for alias in member_shards()]
+
+    def for_user(self, user):
+        return [member for queryset in self.filter(user=user).on_each_shard() for member in queryset]
+
+    def get_from_any_shard(self, **kwargs):
+        for queryset in self.on_each_shard():
+            try:
+                return queryset.get(**kwargs)
+            except self.model.DoesNotExist:
+                pass
+        raise self.model.DoesNotExist("Member matching query does not exist.")
+
+
 class Member(models.Model):
-    user = models.ForeignKey(CustomUser, on_delete=models.CASCADE, related_name='memberships')
-    organization = models.ForeignKey(Organization, on_delete=models.CASCADE, related_name='members')
+    # No database constraints: with sharding the referenced rows live on default.
+    user = models.ForeignKey(CustomUser, on_delete=models.CASCADE, related_name='memberships', db_constraint=False)
+    organization = models.ForeignKey(Organization, on_delete=models.CASCADE, related_name='members', db_constraint=False)
     is_admin = models.BooleanField(default=False)
     joined_at = models.DateTimeField(auto_now_add=True)
 
+    objects = MemberQuerySet.as_manager()
+
     class Meta:
         unique_together = ('user', 'organization')  # prevent duplicate membership
 
     def __str__(self):
         return f"{self.user.email} in {self.organization.name}"
 
+    def validate_unique(self, exclude=None):
+        if not is_sharded():
+            return super().validate_unique(exclude)
+        # The unique_together check would query without a shard; run it on the organization's shard.
+        exclude = set(exclude or ())
+        super().validate_unique(exclude | {'user', 'organization'})
+        if exclude.isdisjoint({'user', 'organization'}) and self.user_id and self.organization_id:
+            duplicate = Member.objects.for_organization(self.organization_id).filter(user_id=self.user_id)
+            if duplicate.exclude(pk=self.pk).exists():
+                raise ValidationError({
+                    NON_FIELD_ERRORS: [self.unique_error_message(Member, ('user', 'organization'))],
+                })
+
+    def save(self, *args, **kwargs):
+        if is_sharded() and self.organization_id is not None:
+            using = shard_for(self.organization_id)
+            if not self._state.adding and self._state.db not in (None, using):
+                # Moved to an organization on another shard
+                Member.objects.using(self._state.db).filter(pk=self.pk).delete()
+                self._state.adding = True
+                kwargs.pop('update_fields', None)
+            if self.pk is None:
+                self.pk = _member_ids.next()
+            if self._state.adding:
+                kwargs['force_insert'] = True
+            kwargs['using'] = using
+        super().save(*args, **kwargs)
+
+
+# Audit Event Model
+class AuditEventQuerySet(models.QuerySet):
+    def for_organization(self, organization_id, since=None, until=None):
+        queryset = self.filter(organization_id=organization_id)
+        if since is not None:
+            queryset = queryset.filter(created_at__gte=since)
+        if until is not None:
+            queryset = queryset.filter(created_at__lt=until)
+        return queryset
+
+
+class AuditEvent(models.Model):
+    MEMBER_ADDED = 'member.added'
+    MEMBER_UPDATED = 'member.updated'
+    MEMBER_REMOVED = 'member.removed'
+    ORGANIZATION_UPDATED = 'organization.updated'
+    ORGANIZATION_DELETED = 'organization.deleted'
+    ACTION_CHOICES = [
+        (MEMBER_ADDED, 'Member added'),
+        (MEMBER_UPDATED, 'Member updated'),
+        (MEMBER_REMOVED, 'Member removed'),
+        (ORGANIZATION_UPDATED, 'Organization updated'),
+        (ORGANIZATION_DELETED, 'Organization deleted'),
+    ]
+
+    action = models.CharField(max_length=32, choices=ACTION_CHOICES)
+    actor = models.ForeignKey(CustomUser, null=True, on_delete=models.SET_NULL, related_name='audit_events')
+    # Plain ids rather than foreign keys so events outlive the rows they describe
+    organization_id = models.BigIntegerField(null=True)
+    member_id = models.BigIntegerField(null=True)
+    details = models.JSONField(default=dict, blank=True)
+    created_at = models.DateTimeField(default=timezone.now)
+
+    objects = AuditEventQuerySet.as_manager()
+
+    class Meta:
+        ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['organization_id', 'created_at']),
+            models.Index(fields=['created_at']),
+        ]
+
+    def __str__(self):
+        return f"{self.action} in organization {self.organization_id}"
+
+
+# Idempotency Record Model
+class IdempotencyRecordQuerySet(models.QuerySet):
+    def expired(self, now=None):
+        return self.filter(expires_at__lte=now or timezone.now())
+
+
+class IdempotencyRecord(models.Model):
+    # sha256 of (user, endpoint, key): one indexed column to claim and look up
+    key_hash = models.CharField(max_length=64, unique=True)
+    key = models.CharField(max_length=255)
+    user = models.ForeignKey(CustomUser, null=True, on_delete=models.CASCADE, related_name='idempotency_records')
+    endpoint = models.CharField(max_length=100)
+    # sha256 of the request data, so a key reused for another request is refused
+    fingerprint = models.CharField(max_length=64)
+    # Both null while the first request is still being handled
+    status_code = models.PositiveSmallIntegerField(null=True)
+    response_data = models.JSONField(null=True, encoder=DjangoJSONEncoder)
+    created_at = models.DateTimeField(default=timezone.now)
+    expires_at = models.DateTimeField(db_index=True)
+
+    objects = IdempotencyRecordQuerySet.as_manager()
+
+    def __str__(self):
+        return f"{self.endpoint} {self.key}"
+
+    @property
+    def in_progress(self):
+        return self.status_code is None
+
+
+# Profile Report Model
+class ProfileReport(models.Model):
+    user = models.ForeignKey(CustomUser, null=True, on_delete=models.SET_NULL, related_name='profile_reports')
+    method = models.CharField(max_length=10)
+    path = models.CharField(max_length=2048)
+    status_code = models.PositiveSmallIntegerField()
+    duration_ms = models.FloatField()
+    query_count = models.PositiveIntegerField()
+    query_time_ms = models.FloatField()
+    queries = models.JSONField(default=list, blank=True)
+    stats = models.TextField(blank=True)
+    created_at = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        ordering = ['-id']
+
+    def __str__(self):
+        return f"{self.method} {self.path} ({self.duration_ms:.0f} ms)"
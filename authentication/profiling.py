@@ -0,0 +1,154 @@
+"""
+On-demand profiling of single requests.
+
+Staff get a signed token from ``manage.py profile_token`` and send it in an
+``X-Profile`` header (or a ``_profile`` query parameter, which ends up in
+access logs; prefer the header). A token only works on requests that
+authenticate as the staff user it was issued to. ProfilingMiddleware then
+runs that one request under cProfile, records every SQL statement with
+its duration through ``connection.execute_wrapper`` and saves a
+ProfileReport, viewable in the Django admin. Only the newest
+PROFILING['BUFFER_SIZE'] reports are kept. The response carries the report
+id in ``X-Profile-Id``.
+
+Requests without the header or parameter pass straight through.
+"""
+
+import cProfile
+import io
+import pstats
+import time
+from contextlib import ExitStack
+
+from django.conf import settings
+from django.core import signing
+from django.db import connections
+from rest_framework.exceptions import APIException
+from rest_framework.request import Request
+from rest_framework.settings import api_settings
+
+from .models import CustomUser, ProfileReport
+
+HEADER = 'HTTP_X_PROFILE'
+QUERY_PARAM = '_profile'
+SALT = 'authentication.profiling'
+
+DEFAULTS = {
+    'BUFFER_SIZE': 50,
+    'TOKEN_MAX_AGE': 60 * 60,
+    'STATS_LIMIT': 40,
+    'MAX_QUERIES': 500,
+}
+
+
+def _option(name):
+    return {**DEFAULTS, **getattr(settings, 'PROFILING', {})}[name]
+
+
+def make_token(user):
+    return signing.dumps({'user': user.pk}, salt=SALT)
+
+
+def _profiling_user(token):
+    """The staff user a valid token was issued to, else None."""
+    try:
+        payload = signing.loads(token, salt=SALT, max_age=_option('TOKEN_MAX_AGE'))
+    except signing.BadSignature:
+        return None
+    return CustomUser.objects.filter(pk=payload.get('user'), is_staff=True, is_active=True).first()
+
+
+def _requester(request):
+    """The user the request authenticates as with the API's authentication classes, else None."""
+    # Runs before the view, so authenticate the way DRF will, without
+    # touching request.user.
+    drf_request = Request(request)
+    for authentication_class in api_settings.DEFAULT_AUTHENTICATION_CLASSES:
+        try:
+            result = authentication_class().authenticate(drf_request)
+        except APIException:
+            return None
+        if result is not None:
+            return result[0]
+    return None
+
+
+def _path_without_token(request):
+    query = request.GET.copy()
+    query.pop(QUERY_PARAM, None)
+    return request.path + ('?' + query.urlencode() if query else '')
+
+
+class _QueryRecorder:
+    def __init__(self, limit):
+        self.limit = limit
+        self.count = 0
+        self.total = 0.0
+        self.queries = []
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            elapsed = time.perf_counter() - start
+            self.count += 1
+            self.total += elapsed
+            if len(self.queries) < self.limit:
+                self.queries.append({
+                    'alias': context['connection'].alias,
+                    'sql': sql,
+                    'duration_ms': round(elapsed * 1000, 3),
+                })
+
+
+class ProfilingMiddleware:
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        token = request.META.get(HEADER)
+        if token is None and QUERY_PARAM + '=' in request.META.get('QUERY_STRING', ''):
+            token = request.GET.get(QUERY_PARAM)
+        if not token:
+            return self.get_response(request)
+
+        user = _profiling_user(token)
+        if user is None or getattr(_requester(request), 'pk', None) != user.pk:
+            return self.get_response(request)
+        return self._profile(request, user)
+
+    def _profile(self, request, user):
+        recorder = _QueryRecorder(_option('MAX_QUERIES'))
+        profiler = cProfile.Profile()
+        with ExitStack() as stack:
+            for alias in connections:
+                stack.enter_context(connections[alias].execute_wrapper(recorder))
+            start = time.perf_counter()
+            profiler.enable()
+            try:
+                response = self.get_response(request)
+            finally:
+                profiler.disable()
+            duration = time.perf_counter() - start
+
+        stats = io.StringIO()
+        pstats.Stats(profiler, stream=stats).sort_stats('cumulative').print_stats(_option('STATS_LIMIT'))
+        report = ProfileReport.objects.create(
+            user=user,
+            method=request.method,
+            path=_path_without_token(request)[:2048],
+            status_code=response.status_code,
+            duration_ms=duration * 1000,
+            query_count=recorder.count,
+            query_time_ms=recorder.total * 1000,
+            queries=recorder.queries,
+            stats=stats.getvalue(),
+        )
+        # Ring buffer: drop everything older than the newest BUFFER_SIZE reports.
+        cutoff = report.pk - _option('BUFFER_SIZE')
+        if cutoff > 0:
+            ProfileReport.objects.filter(pk__lte=cutoff).delete()
+
+        response['X-Profile-Id'] = str(report.pk)
+        return response
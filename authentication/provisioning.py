@@ -0,0 +1,133 @@
+"""
+Bulk user provisioning.
+
+``provision_users()`` takes an iterable of {'email', 'full_name', 'password'}
+dicts and yields one result per row, in order, as each chunk is written.
+Per chunk it validates every row with SignupSerializer's field rules, finds
+existing emails with a single ``email IN (...)`` query, hashes the passwords
+in a process pool and inserts the new users with one ``bulk_create``.
+"""
+
+import os
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+
+import django
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.db import DataError, IntegrityError, transaction
+from rest_framework import serializers
+
+from .serializers import SignupSerializer
+
+User = get_user_model()
+
+
+class _RowSerializer(SignupSerializer):
+    class Meta(SignupSerializer.Meta):
+        # Existing emails are looked up per chunk instead of per row.
+        extra_kwargs = {'email': {'validators': []}}
+
+
+def _validate(serializer, row):
+    """Returns (cleaned row, None) or (None, errors) for one input row."""
+    if not isinstance(row, dict):
+        return None, {"non_field_errors": "Expected an object with email, full_name and password."}
+    try:
+        cleaned = serializer.run_validation(row)
+    except serializers.ValidationError as e:
+        return None, e.detail
+    cleaned['email'] = User.objects.normalize_email(cleaned['email'])
+    return cleaned, None
+
+
+def _chunks(rows, size):
+    rows = iter(rows)
+    while chunk := list(islice(rows, size)):
+        yield chunk
+
+
+def provision_users(rows, chunk_size=1000, workers=None):
+    """
+    Yields {'row', 'email', 'status', ...} for every input row. ``status`` is
+    'created' (with 'id'), 'exists', 'duplicate' (repeated in the input) or
+    'invalid' (with 'errors').
+    """
+    workers = workers or os.cpu_count() or 1
+    # django.setup only matters where workers are spawned rather than forked.
+    executor = ProcessPoolExecutor(max_workers=workers, initializer=django.setup) if workers > 1 else None
+    try:
+        offset = 0
+        for chunk in _chunks(rows, chunk_size):
+            yield from _provision_chunk(chunk, offset, executor, workers)
+            offset += len(chunk)
+    finally:
+        if executor is not None:
+            executor.shutdown(cancel_futures=True)
+
+
+def _provision_chunk(chunk, offset, executor, workers):
+    results = []
+    pending = []
+    seen = set()
+    serializer = _RowSerializer()
+    for index, row in enumerate(chunk, start=offset):
+        cleaned, errors = _validate(serializer, row)
+        if errors:
+            email = row.get('email') if isinstance(row, dict) else None
+            results.append({'row': index, 'email': email, 'status': 'invalid', 'errors': errors})
+        elif cleaned['email'] in seen:
+            results.append({'row': index, 'email': cleaned['email'], 'status': 'duplicate'})
+        else:
+            seen.add(cleaned['email'])
+            result = {'row': index, 'email': cleaned['email']}
+            results.append(result)
+            pending.append((result, cleaned))
+
+    existing = set(User.objects.filter(email__in=seen).values_list('email', flat=True))
+    new = []
+    for result, cleaned in pending:
+        if cleaned['email'] in existing:
+            result['status'] = 'exists'
+        else:
+            new.append((result, cleaned))
+
+    passwords = [cleaned['password'] for result, cleaned in new]
+    if executor is not None and len(passwords) > 1:
+        chunksize = max(1, len(passwords) // (workers * 4))
+        hashes = list(executor.map(make_password, passwords, chunksize=chunksize))
+    else:
+        hashes = [make_password(password) for password in passwords]
+
+    _insert(new, hashes)
+    return results
+
+
+def _insert(new, hashes):
+    users = [
+        User(email=cleaned['email'], full_name=cleaned['full_name'], password=password)
+        for (result, cleaned), password in zip(new, hashes)
+    ]
+    try:
+        with transaction.atomic():
+            User.objects.bulk_create(users)
+    except (IntegrityError, DataError):
+        # Someone signed up with one of these emails since the IN lookup, or
+        # the database rejected a row: find out which, one insert at a time.
+        for (result, cleaned), user in zip(new, users):
+            try:
+                with transaction.atomic():
+                    user.save(force_insert=True)
+            except IntegrityError:
+                result['status'] = 'exists'
+            except DataError as e:
+                result['status'] = 'invalid'
+                result['errors'] = {'non_field_errors': [str(e)]}
+            else:
+                result['status'] = 'created'
+                result['id'] = user.id
+        return
+
+    for (result, cleaned), user in zip(new, users):
+        result['status'] = 'created'
+        result['id'] = user.id
@@ -0,0 +1,103 @@
+"""
+Compact renderers for the list endpoints.
+
+Both keep the usual success/message/data envelope but send a list of
+records in ``data`` as columns: the field names once, then one array of
+values per row. Nested objects become dotted field names
+(``created_by.email``); a row whose nested object is null or lacks a field
+gets None in those columns.
+
+* ``application/vnd.div.columnar+json`` (``?format=columnar``) - plain JSON.
+* ``application/x-msgpack`` (``?format=msgpack``) - the same structure in
+  MessagePack. Only offered when the optional ``msgpack`` package is
+  installed.
+"""
+
+from operator import itemgetter
+
+from rest_framework.renderers import BaseRenderer, JSONRenderer
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+
+def _paths(records, prefix=()):
+    """
+    Column paths in the first record's key order. A nested object that is
+    null in the first record is laid out from the records where it is not.
+    """
+    for key, value in records[0].items():
+        if value is None or isinstance(value, dict):
+            nested = [record[key] for record in records if isinstance(record.get(key), dict)]
+            if nested:
+                yield from _paths(nested, prefix + (key,))
+                continue
+        yield prefix + (key,)
+
+
+def _nested_getter(path):
+    head, rest = path[0], path[1:]
+
+    def get(record):
+        value = record[head]
+        for key in rest:
+            # A null or partial nested object gives None for its fields.
+            if not isinstance(value, dict):
+                return None
+            value = value.get(key)
+        return value
+
+    return get
+
+
+def _row_builder(paths):
+    if len(paths) > 1 and all(len(path) == 1 for path in paths):
+        flat = itemgetter(*(path[0] for path in paths))
+        return lambda record: list(flat(record))
+    getters = [itemgetter(path[0]) if len(path) == 1 else _nested_getter(path) for path in paths]
+    return lambda record: [get(record) for get in getters]
+
+
+def to_columnar(data):
+    """Turns the envelope's list of records into {'fields': [...], 'rows': [[...], ...]}."""
+    if not isinstance(data, dict) or not isinstance(data.get('data'), list):
+        return data
+    records = data['data']
+    if not records:
+        return {**data, 'data': {'fields': [], 'rows': []}}
+    if not isinstance(records[0], dict):
+        return data
+
+    # Every row comes from the same serializer, so the first one fixes the
+    # layout, apart from nested objects it has as null.
+    paths = list(_paths(records))
+    build = _row_builder(paths)
+    return {**data, 'data': {'fields': ['.'.join(path) for path in paths], 'rows': [build(record) for record in records]}}
+
+
+class ColumnarJSONRenderer(JSONRenderer):
+    media_type = 'application/vnd.div.columnar+json'
+    format = 'columnar'
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        return super().render(to_columnar(data), accepted_media_type, renderer_context)
+
+
+class MessagePackRenderer(BaseRenderer):
+    media_type = 'application/x-msgpack'
+    format = 'msgpack'
+    charset = None
+    render_style = 'binary'
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+        # ErrorDetail and friends are str subclasses; anything else msgpack
+        # cannot pack natively is sent as its string form, like JSON does.
+        return msgpack.packb(to_columnar(data), default=str)
+
+
+# Renderers offered by the list endpoints, in negotiation order
+LIST_RENDERER_CLASSES = [ColumnarJSONRenderer] + ([MessagePackRenderer] if msgpack is not None else [])
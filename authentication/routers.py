@@ -0,0 +1,86 @@
+"""
+Database router that shards Member rows by organization.
+
+Every row of an organization lives on ``MEMBER_SHARDS[organization_id %
+len(MEMBER_SHARDS)]``, so org-scoped lookups (admin checks, listing an
+organization's members) hit exactly one database. Lookups that only know a
+user or a member id have to ask every shard; see MemberQuerySet in models.py.
+While sharded, a Member query that names neither a database nor an
+organization raises MemberShardError instead of quietly reading ``default``.
+
+Every other model stays on ``default``. Database aliases other than
+``default`` are treated as member shards and only get the Member table.
+With the default ``MEMBER_SHARDS = ['default']`` nothing is sharded.
+After changing MEMBER_SHARDS, migrate each new alias and run
+``manage.py rebalance_members``.
+"""
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, connections
+
+
+def member_shards():
+    return list(getattr(settings, 'MEMBER_SHARDS', [DEFAULT_DB_ALIAS]))
+
+
+def is_sharded():
+    return member_shards() != [DEFAULT_DB_ALIAS]
+
+
+def shard_for(organization_id):
+    shards = member_shards()
+    return shards[organization_id % len(shards)]
+
+
+def member_databases():
+    """Every alias that may hold Member rows, active shard or not."""
+    return list(connections)
+
+
+class MemberShardError(RuntimeError):
+    pass
+
+
+def _is_member(model):
+    return model._meta.label_lower == 'authentication.member'
+
+
+class MemberShardRouter:
+    def _db_for_member(self, hints, write=False):
+        from .models import Member, Organization
+
+        instance = hints.get('instance')
+        if isinstance(instance, Member):
+            # Unset while the instance is still being built
+            return shard_for(instance.organization_id) if instance.organization_id is not None else None
+        if isinstance(instance, Organization) and instance.pk is not None:
+            return shard_for(instance.pk)
+        # Assigning member.user asks for a write database with the user as hint;
+        # the row itself is placed by Member.save(). Anything else has no shard.
+        if is_sharded() and not (write and instance is not None):
+            raise MemberShardError(
+                "Member query without a shard. Use Member.objects.for_organization(), "
+                "on_each_shard(), get_from_any_shard() or .using(alias)."
+            )
+        return None
+
+    def db_for_read(self, model, **hints):
+        if _is_member(model):
+            return self._db_for_member(hints)
+        return DEFAULT_DB_ALIAS
+
+    def db_for_write(self, model, **hints):
+        if _is_member(model):
+            return self._db_for_member(hints, write=True)
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Members point at users and organizations on default from any shard.
+        if _is_member(type(obj1)) or _is_member(type(obj2)):
+            return True
+        return None
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        if db == DEFAULT_DB_ALIAS:
+            return None
+        return app_label == 'authentication' and model_name == 'member'
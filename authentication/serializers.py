@@ -1,5 +1,12 @@
-from rest_framework import serializers
+import heapq
+from datetime import timezone as dt_timezone
+from operator import itemgetter
+
+from rest_framework import ISO_8601, serializers
+from rest_framework.settings import api_settings
+from django.conf import settings
 from django.contrib.auth import get_user_model
+from django.utils import timezone
 from .models import Organization, Member
 from .validators import (
     validate_email_format,
@@ -62,8 +69,154 @@ class MemberSerializer(serializers.ModelSerializer):
     class Meta:
         model = Member
         fields = ['id', 'user', 'organization', 'is_admin', 'joined_at']
+        # The generated unique_together validator reads Member without a shard; see validate().
+        validators = []
 
     def validate(self, data):
         validate_required_field(data.get("user"), "user")
         validate_required_field(data.get("organization"), "organization")
+        duplicate = Member.objects.for_organization(data["organization"].id).filter(user=data["user"])
+        if self.instance is not None:
+            duplicate = duplicate.exclude(pk=self.instance.pk)
+        if duplicate.exists():
+            raise serializers.ValidationError(
+                "The fields user, organization must make a unique set.", code='unique'
+            )
         return data
+
+
+# Fast read-only serializers
+#
+# The list endpoints only ever read, so instead of running every row through
+# DRF's per-field machinery these build the same dicts straight from
+# ``values_list()`` tuples. Each column is (output key, ORM lookup, converter);
+# a nested serializer is (output key, tuple of columns). A list of querysets
+# ordered by the first column (one per shard) is merged in that order.
+
+def _datetime_to_representation():
+    # Mirrors serializers.DateTimeField.to_representation, resolving the
+    # output format and active timezone once per listing.
+    output_format = api_settings.DATETIME_FORMAT
+    field_timezone = timezone.get_current_timezone() if settings.USE_TZ else None
+
+    def convert(value):
+        if not value:
+            return None
+        if output_format is None or isinstance(value, str):
+            return value
+        if field_timezone is not None:
+            if timezone.is_aware(value):
+                value = value.astimezone(field_timezone)
+            else:
+                value = timezone.make_aware(value, field_timezone)
+        elif timezone.is_aware(value):
+            value = timezone.make_naive(value, dt_timezone.utc)
+        if output_format.lower() == ISO_8601:
+            value = value.isoformat()
+            if value.endswith('+00:00'):
+                value = value[:-6] + 'Z'
+            return value
+        return value.strftime(output_format)
+
+    return convert
+
+
+class FastReadSerializer:
+    model = None
+    serializer_class = None
+    columns = ()
+
+    def __init__(self, queryset=None):
+        self.queryset = queryset if queryset is not None else self.get_default_queryset()
+
+    @classmethod
+    def get_default_queryset(cls):
+        return cls.model.objects.all()
+
+    @classmethod
+    def _flatten(cls, columns):
+        lookups = []
+        for key, spec, *rest in columns:
+            if isinstance(spec, tuple):
+                lookups.extend(cls._flatten(spec))
+            else:
+                lookups.append(spec)
+        return lookups
+
+    @classmethod
+    def _compile(cls, columns, converters, position=0):
+        """
+        Returns a function building one output dict from a values_list tuple,
+        plus the position of the next unread column.
+        """
+        steps = []
+        for key, spec, *rest in columns:
+            if isinstance(spec, tuple):
+                build_nested, position = cls._compile(spec, converters, position)
+                steps.append((key, None, build_nested))
+            else:
+                converter = converters[rest[0]] if rest and rest[0] else None
+                steps.append((key, position, converter))
+                position += 1
+
+        def build(row):
+            data = {}
+            for key, index, convert in steps:
+                if index is None:
+                    data[key] = convert(row)
+                elif convert is None:
+                    data[key] = row[index]
+                else:
+                    data[key] = convert(row[index])
+            return data
+
+        return build, position
+
+    @property
+    def data(self):
+        converters = {'datetime': _datetime_to_representation(), 'str': str, 'bool': bool}
+        build, _ = self._compile(self.columns, converters)
+        lookups = self._flatten(self.columns)
+        if isinstance(self.queryset, (list, tuple)):
+            # One ordered queryset per shard: merge on the first column.
+            rows = heapq.merge(*(queryset.values_list(*lookups) for queryset in self.queryset), key=itemgetter(0))
+        else:
+            rows = self.queryset.values_list(*lookups)
+        return [build(row) for row in rows]
+
+
+class FastOrganizationSerializer(FastReadSerializer):
+    """Read-only equivalent of ``OrganizationSerializer(many=True).data``."""
+    model = Organization
+    serializer_class = OrganizationSerializer
+    columns = (
+        ('id', 'id'),
+        ('name', 'name', 'str'),
+        ('description', 'description', 'str'),
+        ('created_by', (
+            ('id', 'created_by__id'),
+            ('email', 'created_by__email', 'str'),
+            ('full_name', 'created_by__full_name', 'str'),
+            ('is_active', 'created_by__is_active', 'bool'),
+            ('is_staff', 'created_by__is_staff', 'bool'),
+        )),
+        ('created_at', 'created_at', 'datetime'),
+    )
+
+
+class FastMemberSerializer(FastReadSerializer):
+    """Read-only equivalent of ``MemberSerializer(many=True).data``."""
+    model = Member
+    serializer_class = MemberSerializer
+    columns = (
+        ('id', 'id'),
+        ('user', 'user_id'),
+        ('organization', 'organization_id'),
+        ('is_admin', 'is_admin', 'bool'),
+        ('joined_at', 'joined_at', 'datetime'),
+    )
+
+    @classmethod
+    def get_default_queryset(cls):
+        # Members may live on several shards; read each, merged by id.
+        return Member.objects.order_by('id').on_each_shard()
@@ -0,0 +1,21 @@
+from django.db.models.signals import pre_delete
+from django.dispatch import receiver
+
+from .models import CustomUser, Organization, Member
+from .routers import is_sharded
+
+
+# Django only cascades within one database, so deletes reaching Member rows
+# on other shards are done here.
+
+@receiver(pre_delete, sender=Organization)
+def delete_sharded_organization_members(sender, instance, **kwargs):
+    if is_sharded():
+        Member.objects.for_organization(instance.pk).delete()
+
+
+@receiver(pre_delete, sender=CustomUser)
+def delete_sharded_user_memberships(sender, instance, **kwargs):
+    if is_sharded():
+        for queryset in Member.objects.filter(user_id=instance.pk).on_each_shard():
+            queryset.delete()
@@ -1,3 +1,588 @@
-from django.test import TestCase
+import json
+import gzip
+import hashlib
+import os
+import runpy
+import tempfile
+from datetime import timedelta
+from io import StringIO
+from unittest import mock, skipIf
 
-# Create your tests here.
+from django.conf import settings
+from django.contrib.auth.hashers import make_password
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import ConnectionHandler, OperationalError
+from django.test import TestCase, override_settings
+from django.utils import timezone
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import AccessToken
+
+from div.warmup import STEPS, warm_up
+
+from .audit import AuditLog, audit_log
+from .provisioning import provision_users
+from .renderers import msgpack, to_columnar
+from .models import CustomUser, Organization, Member, AuditEvent, IdempotencyRecord, ProfileReport
+from .profiling import make_token
+from .routers import MemberShardError, shard_for
+from .throttling import blocked_keys
+from .serializers import (
+    OrganizationSerializer, MemberSerializer,
+    FastOrganizationSerializer, FastMemberSerializer
+)
+
+
+class FastReadSerializerTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        owner = CustomUser.objects.create_user(email="owner@example.com", password="owner123", full_name="Owner")
+        other = CustomUser.objects.create_user(email="other@example.com", password="other123", is_staff=True)
+        for i in range(3):
+            org = Organization.objects.create(name=f"Org {i}", description="", created_by=owner)
+            Member.objects.create(user=owner, organization=org, is_admin=True)
+            Member.objects.create(user=other, organization=org)
+
+    def assertSameBytes(self, fast, slow):
+        renderer = JSONRenderer()
+        self.assertEqual(renderer.render(fast), renderer.render(slow))
+
+    def test_organization_output_matches(self):
+        queryset = Organization.objects.order_by('id')
+        self.assertSameBytes(
+            FastOrganizationSerializer(queryset).data,
+            OrganizationSerializer(queryset, many=True).data,
+        )
+
+    def test_member_output_matches(self):
+        queryset = Member.objects.order_by('id')
+        self.assertSameBytes(
+            FastMemberSerializer(queryset).data,
+            MemberSerializer(queryset, many=True).data,
+        )
+
+    def test_output_matches_with_custom_datetime_format(self):
+        queryset = Organization.objects.order_by('id')
+        with override_settings(REST_FRAMEWORK={'DATETIME_FORMAT': '%d/%m/%Y %H:%M'}):
+            self.assertIn('/', FastOrganizationSerializer(queryset).data[0]['created_at'])
+            self.assertSameBytes(
+                FastOrganizationSerializer(queryset).data,
+                OrganizationSerializer(queryset, many=True).data,
+            )
+
+    def test_output_matches_in_active_timezone(self):
+        queryset = Member.objects.order_by('id')
+        with timezone.override("Asia/Kolkata"):
+            self.assertSameBytes(
+                FastMemberSerializer(queryset).data,
+                MemberSerializer(queryset, many=True).data,
+            )
+
+
+class WarmUpTests(TestCase):
+    def test_warm_up_runs_every_step(self):
+        with self.assertNoLogs('div.warmup', level='ERROR'):
+            timings = warm_up()
+        self.assertEqual(list(timings), [name for name, step in STEPS] + ['database'])
+
+    @override_settings(MEMBER_SHARDS=['default'])
+    def test_preload_leaves_no_connection_for_workers(self):
+        hooks = runpy.run_path(str(settings.BASE_DIR / 'gunicorn.conf.py'))
+        with tempfile.TemporaryDirectory() as directory:
+            handler = ConnectionHandler({'default': {
+                'ENGINE': 'django.db.backends.sqlite3', 'NAME': os.path.join(directory, 'db.sqlite3'),
+            }})
+            with mock.patch('div.warmup.connections', handler), mock.patch('django.db.connections', handler):
+                warm_up()  # as div.wsgi runs it in the master
+                self.assertIsNotNone(handler['default'].connection)
+                hooks['pre_fork'](mock.Mock(cfg=mock.Mock(preload_app=True)), None)
+            self.assertIsNone(handler['default'].connection)
+
+    def test_warm_up_disabled(self):
+        with self.settings(WARMUP_ON_STARTUP=False):
+            self.assertEqual(warm_up(), {})
+
+
+class AuditLogTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = CustomUser.objects.create_user(email="admin@example.com", password="admin123")
+        cls.user = CustomUser.objects.create_user(email="user@example.com", password="user1234")
+        cls.org = Organization.objects.create(name="Audited", created_by=cls.admin)
+        Member.objects.create(user=cls.admin, organization=cls.org, is_admin=True)
+
+    def test_events_are_buffered_until_batch_is_full(self):
+        log = AuditLog(batch_size=3, background=False)
+        log.record(AuditEvent.MEMBER_ADDED, actor=self.admin, organization_id=self.org.id)
+        log.record(AuditEvent.MEMBER_REMOVED, actor=self.admin, organization_id=self.org.id)
+        self.assertEqual(AuditEvent.objects.count(), 0)
+
+        with self.assertNumQueries(1):
+            log.record(AuditEvent.MEMBER_ADDED, actor=self.admin, organization_id=self.org.id)
+        self.assertEqual(AuditEvent.objects.count(), 3)
+        self.assertEqual(log.flush(), 0)
+
+    def test_buffer_is_capped_while_flushes_fail(self):
+        log = AuditLog(batch_size=2, background=False, max_pending=3)
+        with mock.patch.object(AuditEvent.objects, 'bulk_create', side_effect=RuntimeError("db down")), \
+                self.assertLogs('authentication.audit', level='WARNING') as logs:
+            for member_id in range(6):
+                try:
+                    log.record(AuditEvent.MEMBER_ADDED, actor=self.admin, organization_id=self.org.id, member_id=member_id)
+                except RuntimeError:
+                    pass
+        self.assertIn("dropped", logs.output[0])
+
+        self.assertEqual(log.flush(), 3)
+        self.assertEqual(sorted(AuditEvent.objects.values_list('member_id', flat=True)), [3, 4, 5])
+
+    def test_for_organization_filters_time_range(self):
+        log = AuditLog(background=False)
+        log.record(AuditEvent.ORGANIZATION_UPDATED, actor=self.admin, organization_id=self.org.id)
+        log.record(AuditEvent.ORGANIZATION_UPDATED, actor=self.admin, organization_id=self.org.id + 1)
+        log.flush()
+
+        now = timezone.now()
+        self.assertEqual(AuditEvent.objects.for_organization(self.org.id).count(), 1)
+        self.assertEqual(AuditEvent.objects.for_organization(self.org.id, since=now).count(), 0)
+        self.assertEqual(
+            AuditEvent.objects.for_organization(self.org.id, since=now - timedelta(minutes=1), until=now).count(), 1
+        )
+
+    def test_member_views_record_events(self):
+        client = APIClient()
+        client.force_authenticate(self.admin)
+        with mock.patch.object(audit_log, 'background', False):
+            response = client.post(
+                '/authentication/members/create', {'user': self.user.id, 'organization': self.org.id}
+            )
+            member_id = response.data['data']['id']
+            client.delete(f'/authentication/members/delete/{member_id}')
+            audit_log.flush()
+
+        events = AuditEvent.objects.for_organization(self.org.id).order_by('created_at')
+        self.assertEqual([e.action for e in events], [AuditEvent.MEMBER_ADDED, AuditEvent.MEMBER_REMOVED])
+        self.assertEqual(events[1].member_id, member_id)
+        self.assertEqual(events[1].details, {'user': self.user.id})
+
+
+@override_settings(PASSWORD_HASHERS=['django.contrib.auth.hashers.MD5PasswordHasher'])
+class LoginThrottleTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = CustomUser.objects.create_user(email="victim@example.com", password="secret123")
+
+    def setUp(self):
+        cache.clear()
+        blocked_keys.clear()
+        self.addCleanup(cache.clear)
+        self.addCleanup(blocked_keys.clear)
+
+    def login(self, email="victim@example.com", password="wrong123", ip="10.0.0.1"):
+        return APIClient(REMOTE_ADDR=ip).post('/authentication/login/', {'email': email, 'password': password})
+
+    def test_email_flood_is_rejected_before_authentication(self):
+        for _ in range(5):
+            self.assertEqual(self.login().status_code, 200)
+
+        with mock.patch('authentication.views.authenticate') as authenticate, self.assertNumQueries(0):
+            for _ in range(50):
+                self.assertEqual(self.login().status_code, 429)
+        authenticate.assert_not_called()
+
+        # Other accounts and endpoints are unaffected.
+        response = self.login(email="other@example.com", ip="10.0.0.2")
+        self.assertEqual(response.status_code, 200)
+        client = APIClient()
+        client.force_authenticate(self.user)
+        self.assertEqual(client.get('/authentication/organizations/get').data['success'], 1)
+
+    def test_ip_flood_is_rejected_across_emails(self):
+        for i in range(30):
+            self.assertEqual(self.login(email=f"user{i}@example.com").status_code, 200)
+        response = self.login(email="fresh@example.com")
+        self.assertEqual(response.status_code, 429)
+        self.assertIn('Retry-After', response)
+        self.assertEqual(response.data['success'], 0)
+        self.assertEqual(response.data['data'], {})
+        self.assertIn('throttled', str(response.data['message']))
+
+    def test_spoofed_forwarded_for_is_still_throttled(self):
+        for i in range(31):
+            response = APIClient(HTTP_X_FORWARDED_FOR=f"203.0.113.{i}").post(
+                '/authentication/login/', {'email': f"user{i}@example.com", 'password': "wrong123"}
+            )
+        self.assertEqual(response.status_code, 429)
+
+
+@override_settings(MEMBER_SHARDS=['members_0', 'members_1'])
+class MemberShardingTests(TestCase):
+    databases = {'default', 'members_0', 'members_1'}
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = CustomUser.objects.create_user(email="admin@example.com", password="admin123")
+        cls.user = CustomUser.objects.create_user(email="user@example.com", password="user1234")
+        cls.orgs = [Organization.objects.create(name=f"Org {i}", created_by=cls.admin) for i in range(4)]
+        for org in cls.orgs:
+            Member.objects.create(user=cls.admin, organization=org, is_admin=True)
+
+    def test_members_are_stored_on_their_organization_shard(self):
+        for org in self.orgs:
+            self.assertEqual(Member.objects.using(shard_for(org.id)).filter(organization=org).count(), 1)
+        self.assertFalse(Member.objects.using('default').exists())
+        self.assertEqual({shard_for(org.id) for org in self.orgs}, {'members_0', 'members_1'})
+
+    def test_member_ids_are_unique_across_shards(self):
+        ids = [member.id for member in Member.objects.for_user(self.admin)]
+        self.assertEqual(len(ids), len(set(ids)), ids)
+        self.assertEqual(len(ids), 4)
+
+    def test_org_lookup_queries_one_shard(self):
+        org = self.orgs[0]
+        with self.assertNumQueries(1, using=shard_for(org.id)), self.assertNumQueries(0, using='default'):
+            self.assertTrue(Member.objects.for_organization(org.id).filter(user=self.admin, is_admin=True).exists())
+
+    def test_views_use_shards(self):
+        client = APIClient()
+        client.force_authenticate(self.admin)
+        org = self.orgs[1]
+        with mock.patch.object(audit_log, 'record'):
+            response = client.post('/authentication/members/create', {'user': self.user.id, 'organization': org.id})
+        self.assertEqual(response.data['success'], 1, response.data)
+        member_id = response.data['data']['id']
+
+        self.assertEqual(client.get(f'/authentication/members/update/{member_id}').data['data']['user'], self.user.id)
+        listed = client.get('/authentication/members/get').data['data']
+        self.assertEqual([m['id'] for m in listed], sorted(m['id'] for m in listed))
+        self.assertEqual(len(listed), 5)
+
+        with mock.patch.object(audit_log, 'record'):
+            client.delete(f'/authentication/organizations/delete/{org.id}')
+        self.assertFalse(Member.objects.using(shard_for(org.id)).filter(organization_id=org.id).exists())
+
+    def test_duplicate_member_is_a_validation_error(self):
+        client = APIClient()
+        client.force_authenticate(self.admin)
+        org = self.orgs[1]
+        response = client.post('/authentication/members/create', {'user': self.admin.id, 'organization': org.id})
+        self.assertEqual(response.data['success'], 0)
+        self.assertEqual(
+            response.data['message'],
+            {'non_field_errors': ["The fields user, organization must make a unique set."]},
+        )
+
+    def test_member_query_without_shard_raises(self):
+        with self.assertRaises(MemberShardError):
+            Member.objects.count()
+        with self.assertRaises(MemberShardError):
+            self.admin.memberships.count()
+        self.assertEqual(self.orgs[1].members.count(), 1)
+
+    def test_admin_lists_one_shard_at_a_time(self):
+        superuser = CustomUser.objects.create_superuser(email="root@example.com", password="root1234")
+        self.client.force_login(superuser)
+        for alias in ('members_0', 'members_1'):
+            response = self.client.get('/admin/authentication/member/', {'shard': alias})
+            self.assertEqual(response.status_code, 200)
+            self.assertEqual(
+                {member.pk for member in response.context['cl'].result_list},
+                set(Member.objects.using(alias).values_list('pk', flat=True)),
+            )
+        member = Member.objects.for_organization(self.orgs[1].id).get()
+        response = self.client.get(
+            '/admin/authentication/member/', {'shard': shard_for(self.orgs[1].id), 'q': self.orgs[1].name}
+        )
+        self.assertEqual([m.pk for m in response.context['cl'].result_list], [member.pk])
+        response = self.client.get(f'/admin/authentication/member/{member.pk}/change/')
+        self.assertEqual(response.status_code, 200)
+
+    def test_fast_serializer_reads_every_shard_by_default(self):
+        ids = [row['id'] for row in FastMemberSerializer().data]
+        self.assertEqual(ids, sorted(member.id for member in Member.objects.for_user(self.admin)))
+
+    def test_bench_serializers_runs_sharded(self):
+        out = StringIO()
+        call_command('bench_serializers', rows=5, repeat=1, stdout=out)
+        self.assertIn('FastMemberSerializer', out.getvalue())
+        self.assertEqual(sum(queryset.count() for queryset in Member.objects.on_each_shard()), 4)
+
+    def test_rebalance_moves_rows_to_new_shards(self):
+        with self.settings(MEMBER_SHARDS=['members_0']):
+            call_command('rebalance_members', stdout=StringIO())
+            self.assertEqual(Member.objects.using('members_0').count(), 4)
+        self.assertFalse(Member.objects.using('members_1').exists())
+
+        call_command('rebalance_members', stdout=StringIO())
+        for org in self.orgs:
+            self.assertTrue(Member.objects.for_organization(org.id).exists())
+        self.assertEqual(sum(qs.count() for qs in Member.objects.on_each_shard()), 4)
+
+
+@override_settings(PASSWORD_HASHERS=['django.contrib.auth.hashers.MD5PasswordHasher'])
+class ProvisioningTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.staff = CustomUser.objects.create_user(email="staff@example.com", password="staff123", is_staff=True)
+
+    def test_provision_reports_each_row(self):
+        rows = [
+            {'email': 'a@example.com', 'full_name': 'A', 'password': 'pass1234'},
+            {'email': 'bad-email', 'full_name': 'B', 'password': 'pass1234'},
+            {'email': 'staff@example.com', 'full_name': 'S', 'password': 'pass1234'},
+            {'email': 'a@example.com', 'full_name': 'A again', 'password': 'pass1234'},
+            {'email': 'c@example.com', 'full_name': 'C', 'password': 'short'},
+            {'email': 'foo bar@example.com', 'full_name': 'F', 'password': 'pass1234'},
+            {'email': 'long@example.com', 'full_name': 'L' * 300, 'password': 'pass1234'},
+            {'email': 'padded@example.com', 'full_name': '  Padded  ', 'password': 'pass1234'},
+        ] + [{'email': f'u{i}@example.com', 'full_name': f'U{i}', 'password': 'pass1234'} for i in range(5)]
+
+        results = list(provision_users(rows, chunk_size=4, workers=2))
+
+        self.assertEqual([r['row'] for r in results], list(range(len(rows))))
+        self.assertEqual(
+            [r['status'] for r in results[:8]],
+            ['created', 'invalid', 'exists', 'duplicate', 'invalid', 'invalid', 'invalid', 'created'],
+        )
+        self.assertIn('password', results[4]['errors'])
+        self.assertIn('email', results[5]['errors'])
+        self.assertIn('full_name', results[6]['errors'])
+        self.assertEqual(CustomUser.objects.get(email='padded@example.com').full_name, 'Padded')
+        user = CustomUser.objects.get(email='u4@example.com')
+        self.assertEqual(user.id, results[-1]['id'])
+        self.assertTrue(user.check_password('pass1234'))
+
+    def test_rows_taken_during_insert_are_reported(self):
+        rows = [{'email': f'r{i}@example.com', 'full_name': f'R{i}', 'password': 'pass1234'} for i in range(3)]
+
+        def hash_then_race(password):
+            # Another signup lands between the existing-email lookup and the insert.
+            if not CustomUser.objects.filter(email='r1@example.com').exists():
+                CustomUser.objects.create_user(email='r1@example.com', password='pass1234')
+            return make_password(password)
+
+        with mock.patch('authentication.provisioning.make_password', side_effect=hash_then_race):
+            results = list(provision_users(rows, workers=1))
+
+        self.assertEqual([r['status'] for r in results], ['created', 'exists', 'created'])
+        self.assertEqual(CustomUser.objects.filter(email__startswith='r').count(), 3)
+
+    def test_bulk_create_endpoint_streams_results(self):
+        client = APIClient()
+        client.force_authenticate(self.staff)
+        users = [{'email': f'n{i}@example.com', 'full_name': f'N{i}', 'password': 'pass1234'} for i in range(3)]
+
+        response = client.post('/authentication/users/bulk-create', {'users': users}, format='json')
+        lines = [json.loads(line) for line in b"".join(response.streaming_content).splitlines()]
+
+        self.assertEqual([line['status'] for line in lines[:-1]], ['created'] * 3)
+        self.assertEqual(lines[-1]['data'], {'created': 3})
+        self.assertEqual(CustomUser.objects.filter(email__startswith='n').count(), 3)
+
+    def test_bulk_create_requires_staff(self):
+        client = APIClient()
+        client.force_authenticate(CustomUser.objects.create_user(email="x@example.com", password="x1234567"))
+        response = client.post('/authentication/users/bulk-create', {'users': []}, format='json')
+        self.assertEqual(response.status_code, 403)
+
+
+class IdempotencyTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = CustomUser.objects.create_user(email="owner@example.com", password="owner123")
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def create(self, name, key="key-1"):
+        return self.client.post('/authentication/organizations/create', {'name': name}, HTTP_IDEMPOTENCY_KEY=key)
+
+    def test_retry_replays_stored_response(self):
+        first = self.create("Retried")
+        with self.assertNumQueries(1):
+            second = self.create("Retried")
+
+        self.assertEqual(second.data, first.data)
+        self.assertEqual(second['Idempotent-Replayed'], 'true')
+        self.assertEqual(Organization.objects.filter(name="Retried").count(), 1)
+
+    def test_key_reused_for_different_request_is_refused(self):
+        self.create("First")
+        response = self.create("Second")
+        self.assertEqual(response.status_code, 422)
+        self.assertFalse(Organization.objects.filter(name="Second").exists())
+
+    def test_keys_are_scoped_per_user(self):
+        self.create("Mine")
+        other = APIClient()
+        other.force_authenticate(CustomUser.objects.create_user(email="other@example.com", password="other123"))
+        response = other.post('/authentication/organizations/create', {'name': "Theirs"}, HTTP_IDEMPOTENCY_KEY="key-1")
+        self.assertEqual(response.data['success'], 1)
+
+    @override_settings(PASSWORD_HASHERS=['django.contrib.auth.hashers.MD5PasswordHasher'])
+    def test_anonymous_signup_keys_are_scoped_per_address(self):
+        body = {'email': 'new@example.com', 'full_name': 'New', 'password': 'secret123'}
+        first = APIClient(REMOTE_ADDR='10.0.0.1').post('/authentication/signup/', body, HTTP_IDEMPOTENCY_KEY='k')
+        other = APIClient(REMOTE_ADDR='10.0.0.2').post(
+            '/authentication/signup/', {**body, 'email': 'else@example.com'}, HTTP_IDEMPOTENCY_KEY='k'
+        )
+        self.assertEqual(first.data['success'], 1, first.data)
+        self.assertEqual(other.data['success'], 1, other.data)
+        self.assertNotIn('Idempotent-Replayed', other)
+
+    @override_settings(PASSWORD_HASHERS=['django.contrib.auth.hashers.MD5PasswordHasher'])
+    def test_fingerprint_is_keyed_by_secret(self):
+        body = {'email': 'new@example.com', 'full_name': 'New', 'password': 'secret123'}
+        APIClient().post('/authentication/signup/', body, HTTP_IDEMPOTENCY_KEY='k')
+        fingerprint = IdempotencyRecord.objects.get().fingerprint
+        plain = hashlib.sha256(json.dumps(body, sort_keys=True).encode()).hexdigest()
+        self.assertNotEqual(fingerprint, plain)
+
+    def test_failed_request_releases_key(self):
+        with mock.patch.object(OrganizationSerializer, 'save', side_effect=OperationalError("database is locked")):
+            failed = self.create("Flaky")
+        self.assertEqual(failed.data['success'], 0)
+        self.assertFalse(IdempotencyRecord.objects.exists())
+
+        retried = self.create("Flaky")
+        self.assertEqual(retried.data['success'], 1, retried.data)
+        self.assertFalse(retried.has_header('Idempotent-Replayed'))
+        self.assertEqual(Organization.objects.filter(name="Flaky").count(), 1)
+
+    def test_duplicate_of_in_flight_request_waits(self):
+        first = self.create("Busy")
+        stored = first.data
+        IdempotencyRecord.objects.update(status_code=None, response_data=None)
+
+        def first_request_finishes(delay):
+            IdempotencyRecord.objects.update(status_code=200, response_data=stored)
+
+        with mock.patch('authentication.idempotency.time.sleep', side_effect=first_request_finishes) as sleep:
+            response = self.create("Busy")
+
+        sleep.assert_called_once()
+        self.assertEqual(response.data, stored)
+        self.assertEqual(response['Idempotent-Replayed'], 'true')
+        self.assertEqual(Organization.objects.filter(name="Busy").count(), 1)
+
+    @override_settings(IDEMPOTENCY={'WAIT_TIMEOUT': 0})
+    def test_duplicate_gives_up_after_wait_timeout(self):
+        self.create("Stuck")
+        IdempotencyRecord.objects.update(status_code=None, response_data=None)
+        response = self.create("Stuck")
+        self.assertEqual(response.status_code, 409)
+        self.assertEqual(Organization.objects.filter(name="Stuck").count(), 1)
+
+    def test_prune_deletes_expired_records(self):
+        self.create("Old", key="old")
+        self.create("New", key="new")
+        IdempotencyRecord.objects.filter(key="old").update(expires_at=timezone.now())
+
+        call_command('prune_idempotency_keys', stdout=StringIO())
+        self.assertEqual(list(IdempotencyRecord.objects.values_list('key', flat=True)), ["new"])
+
+
+class ListRendererTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = CustomUser.objects.create_user(email="owner@example.com", password="owner123", full_name="Owner")
+        for i in range(40):
+            Organization.objects.create(name=f"Org {i}", description="x" * 50, created_by=cls.user)
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def test_columnar_json_matches_records(self):
+        records = self.client.get('/authentication/organizations/get').json()['data']
+        response = self.client.get('/authentication/organizations/get', HTTP_ACCEPT='application/vnd.div.columnar+json')
+
+        self.assertEqual(response['Content-Type'], 'application/vnd.div.columnar+json')
+        body = json.loads(response.content)
+        self.assertEqual(body['success'], 1)
+        fields = body['data']['fields']
+        self.assertIn('created_by.email', fields)
+        self.assertEqual(len(body['data']['rows']), len(records))
+        first = dict(zip(fields, body['data']['rows'][0]))
+        self.assertEqual(first['name'], records[0]['name'])
+        self.assertEqual(first['created_by.email'], records[0]['created_by']['email'])
+
+    def test_null_nested_object_gives_none_columns(self):
+        data = {'success': 1, 'message': '', 'data': [
+            {'id': 1, 'created_by': {'id': 7, 'email': 'a@example.com'}},
+            {'id': 2, 'created_by': None},
+            {'id': 3, 'created_by': {'id': 8}},
+        ]}
+        self.assertEqual(to_columnar(data)['data'], {
+            'fields': ['id', 'created_by.id', 'created_by.email'],
+            'rows': [[1, 7, 'a@example.com'], [2, None, None], [3, 8, None]],
+        })
+
+        data['data'].insert(0, {'id': 0, 'created_by': None})
+        self.assertEqual(to_columnar(data)['data'], {
+            'fields': ['id', 'created_by.id', 'created_by.email'],
+            'rows': [[0, None, None], [1, 7, 'a@example.com'], [2, None, None], [3, 8, None]],
+        })
+
+    @skipIf(msgpack is None, "msgpack is not installed")
+    def test_msgpack_format(self):
+        response = self.client.get('/authentication/members/get?format=msgpack')
+        self.assertEqual(response['Content-Type'], 'application/x-msgpack')
+        self.assertEqual(msgpack.unpackb(response.content)['data'], {'fields': [], 'rows': []})
+
+    def test_large_responses_are_gzipped(self):
+        response = self.client.get('/authentication/organizations/get', HTTP_ACCEPT_ENCODING='gzip')
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        self.assertEqual(json.loads(gzip.decompress(response.content))['success'], 1)
+
+        small = self.client.get('/authentication/members/get', HTTP_ACCEPT_ENCODING='gzip')
+        self.assertFalse(small.has_header('Content-Encoding'))
+
+
+class ProfilingTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.staff = CustomUser.objects.create_user(email="staff@example.com", password="staff123", is_staff=True)
+        cls.user = CustomUser.objects.create_user(email="user@example.com", password="user1234")
+
+    def setUp(self):
+        # Real JWTs: the middleware authenticates before the view.
+        self.client = APIClient()
+        self.client.credentials(HTTP_AUTHORIZATION='Bearer ' + str(AccessToken.for_user(self.staff)))
+
+    def test_signed_header_profiles_request(self):
+        response = self.client.get('/authentication/organizations/get', HTTP_X_PROFILE=make_token(self.staff))
+
+        report = ProfileReport.objects.get(pk=response['X-Profile-Id'])
+        self.assertEqual(report.path, '/authentication/organizations/get')
+        self.assertEqual(report.user, self.staff)
+        self.assertEqual(report.query_count, len(report.queries))
+        self.assertTrue(any('authentication_organization' in query['sql'] for query in report.queries))
+        self.assertIn('cumulative', report.stats)
+
+    def test_query_flag_profiles_request(self):
+        response = self.client.get('/authentication/members/get', {'_profile': make_token(self.staff), 'page': '2'})
+        report = ProfileReport.objects.get(pk=response['X-Profile-Id'])
+        self.assertEqual(report.path, '/authentication/members/get?page=2')
+
+    def test_untriggered_or_unauthorized_requests_are_not_profiled(self):
+        for headers in ({}, {'HTTP_X_PROFILE': make_token(self.user)}, {'HTTP_X_PROFILE': 'forged'}):
+            response = self.client.get('/authentication/members/get', **headers)
+            self.assertFalse(response.has_header('X-Profile-Id'))
+        self.assertFalse(ProfileReport.objects.exists())
+
+    def test_token_only_works_for_its_staff_user(self):
+        other = APIClient()
+        other.credentials(HTTP_AUTHORIZATION='Bearer ' + str(AccessToken.for_user(self.user)))
+        for client in (other, APIClient()):
+            response = client.get('/authentication/members/get', HTTP_X_PROFILE=make_token(self.staff))
+            self.assertFalse(response.has_header('X-Profile-Id'))
+        self.assertFalse(ProfileReport.objects.exists())
+
+    @override_settings(PROFILING={'BUFFER_SIZE': 3})
+    def test_reports_are_kept_in_a_ring_buffer(self):
+        token = make_token(self.staff)
+        ids = [int(self.client.get('/authentication/members/get', HTTP_X_PROFILE=token)['X-Profile-Id']) for _ in range(5)]
+        self.assertEqual(sorted(ProfileReport.objects.values_list('pk', flat=True)), ids[-3:])
@@ -0,0 +1,146 @@
+"""
+Sliding-window rate limiting for the login and signup endpoints.
+
+Counters live in the shared cache (CACHES['default']) as one fixed-window
+count per key, and the previous window's count is weighted by how much of it
+still overlaps the sliding window. Once a key goes over its limit the
+rejection is remembered in process until the window has slid past it, so a
+flood of retries is turned away without any cache round trip.
+
+DRF runs throttles from ``APIView.initial()``, before the handler, so a
+rejected request never reaches password hashing or the ORM.
+
+Per-IP limits key on the address DRF's ``get_ident`` trusts: with
+REST_FRAMEWORK['NUM_PROXIES'] = 0 that is REMOTE_ADDR, so a client cannot
+dodge them by rotating X-Forwarded-For. Raise NUM_PROXIES to the number of
+reverse proxies in front of the app when deploying behind them.
+"""
+
+import hashlib
+import threading
+
+from rest_framework.exceptions import Throttled
+from rest_framework.throttling import SimpleRateThrottle
+from rest_framework.views import exception_handler as drf_exception_handler
+
+
+class _BlockedKeys:
+    """In-process front tier: key -> time until which it is rejected."""
+
+    max_size = 10000
+
+    def __init__(self):
+        self._until = {}
+        self._lock = threading.Lock()
+
+    def blocked_for(self, key, now):
+        until = self._until.get(key)
+        if until is None:
+            return None
+        if until <= now:
+            self._until.pop(key, None)
+            return None
+        return until - now
+
+    def block(self, key, until, now):
+        with self._lock:
+            if len(self._until) >= self.max_size:
+                self._until = {k: v for k, v in self._until.items() if v > now}
+                if len(self._until) >= self.max_size:
+                    self._until.clear()
+            self._until[key] = until
+
+    def clear(self):
+        with self._lock:
+            self._until.clear()
+
+
+blocked_keys = _BlockedKeys()
+
+
+class SlidingWindowThrottle(SimpleRateThrottle):
+
+    def allow_request(self, request, view):
+        if self.rate is None:
+            return True
+
+        self.key = self.get_cache_key(request, view)
+        if self.key is None:
+            return True
+
+        self.now = self.timer()
+        self.wait_time = blocked_keys.blocked_for(self.key, self.now)
+        if self.wait_time is not None:
+            return False
+
+        window = int(self.now // self.duration)
+        current_key = f'{self.key}_{window}'
+        previous_key = f'{self.key}_{window - 1}'
+        counts = self.cache.get_many([current_key, previous_key])
+        current = counts.get(current_key, 0)
+        previous = counts.get(previous_key, 0)
+
+        elapsed = (self.now % self.duration) / self.duration
+        if previous * (1 - elapsed) + current >= self.num_requests:
+            self.wait_time = self._wait(previous, current, elapsed)
+            blocked_keys.block(self.key, self.now + self.wait_time, self.now)
+            return False
+
+        # Windows are kept for two durations so the next one can weigh them.
+        if self.cache.add(current_key, 1, self.duration * 2):
+            return True
+        try:
+            self.cache.incr(current_key)
+        except ValueError:
+            # Expired between add() and incr()
+            self.cache.set(current_key, 1, self.duration * 2)
+        return True
+
+    def _wait(self, previous, current, elapsed):
+        """Seconds until the weighted count drops below the limit again."""
+        if current >= self.num_requests:
+            # Wait for the next window, then for this one (as the previous
+            # window) to weigh little enough.
+            return ((1 - elapsed) + max(0.0, 1 - self.num_requests / current)) * self.duration
+        return (1 - (self.num_requests - current) / previous - elapsed) * self.duration
+
+    def wait(self):
+        return self.wait_time
+
+
+class _IPThrottle(SlidingWindowThrottle):
+    def get_cache_key(self, request, view):
+        return self.cache_format % {'scope': self.scope, 'ident': self.get_ident(request)}
+
+
+class _EmailThrottle(SlidingWindowThrottle):
+    def get_cache_key(self, request, view):
+        email = request.data.get('email') if hasattr(request.data, 'get') else None
+        if not email or not isinstance(email, str):
+            return None
+        ident = hashlib.sha1(email.strip().lower().encode()).hexdigest()
+        return self.cache_format % {'scope': self.scope, 'ident': ident}
+
+
+class LoginIPThrottle(_IPThrottle):
+    scope = 'login_ip'
+
+
+class LoginEmailThrottle(_EmailThrottle):
+    scope = 'login_email'
+
+
+class SignupIPThrottle(_IPThrottle):
+    scope = 'signup_ip'
+
+
+class SignupEmailThrottle(_EmailThrottle):
+    scope = 'signup_email'
+
+
+def exception_handler(exc, context):
+    """DRF's exception handler, with 429s in the success/message/data envelope."""
+    response = drf_exception_handler(exc, context)
+    if isinstance(exc, Throttled) and response is not None:
+        response.data = {"success": 0, "message": exc.detail, "data": {}}
+    return response
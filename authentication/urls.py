@@ -1,6 +1,6 @@
 from django.urls import path
 from .views import (
-    SignupAPIView, LoginAPIView, LogoutAPIView,
+    SignupAPIView, LoginAPIView, LogoutAPIView, UserBulkCreateAPIView,
     OrganizationCreateAPIView, OrganizationListAPIView, OrganizationUpdateAPIView, OrganizationDeleteAPIView,
     MemberCreateAPIView, MemberListAPIView, MemberUpdateAPIView, MemberDeleteAPIView
 )
@@ -10,6 +10,7 @@ urlpatterns = [
     path('signup/', SignupAPIView.as_view(), name='signup'),
     path('login/', LoginAPIView.as_view(), name='login'),
     path('logout/', LogoutAPIView.as_view(), name='logout'),
+    path('users/bulk-create', UserBulkCreateAPIView.as_view(), name='user-bulk-create'),
 
     
     path('organizations/create', OrganizationCreateAPIView.as_view(), name='organization-create'),
@@ -1,15 +1,30 @@
+import json
+
 from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework.exceptions import ValidationError
-from rest_framework.permissions import IsAuthenticated
+from rest_framework.permissions import IsAuthenticated, IsAdminUser
+from rest_framework.settings import api_settings
 from rest_framework_simplejwt.tokens import RefreshToken,TokenError
 from django.contrib.auth import authenticate
-from .models import CustomUser, Organization, Member
-from .serializers import SignupSerializer, OrganizationSerializer, MemberSerializer
+from django.http import StreamingHttpResponse
+from .models import CustomUser, Organization, Member, AuditEvent
+from .serializers import (
+    SignupSerializer, OrganizationSerializer, MemberSerializer,
+    FastOrganizationSerializer, FastMemberSerializer
+)
 from .validators import validate_required_field
+from .audit import audit_log
+from .idempotency import idempotent
+from .provisioning import provision_users
+from .renderers import LIST_RENDERER_CLASSES
+from .throttling import LoginIPThrottle, LoginEmailThrottle, SignupIPThrottle, SignupEmailThrottle
 
 
 class SignupAPIView(APIView):
+    throttle_classes = [SignupIPThrottle, SignupEmailThrottle]
+
+    @idempotent
     def post(self, request):
         context = {"success": 1, "message": "User registered successfully", "data": {}}
         try:
@@ -27,6 +42,8 @@ class SignupAPIView(APIView):
 
 
 class LoginAPIView(APIView):
+    throttle_classes = [LoginIPThrottle, LoginEmailThrottle]
+
     def post(self, request):
         context = {"success": 1, "message": "Login successful", "data": {}}
         try:
@@ -58,6 +75,26 @@ class LoginAPIView(APIView):
 
 
 
+class UserBulkCreateAPIView(APIView):
+    permission_classes = [IsAdminUser]
+
+    def post(self, request):
+        users = request.data.get('users') if hasattr(request.data, 'get') else None
+        if not isinstance(users, list) or not users:
+            return Response({"success": 0, "message": "A non-empty 'users' list is required.", "data": {}})
+
+        # One JSON line per input row as each chunk is inserted, then a
+        # summary line in the usual success/message/data envelope.
+        def stream():
+            counts = {}
+            for result in provision_users(users):
+                counts[result['status']] = counts.get(result['status'], 0) + 1
+                yield json.dumps(result) + "\n"
+            yield json.dumps({"success": 1, "message": "Users provisioned", "data": counts}) + "\n"
+
+        return StreamingHttpResponse(stream(), content_type='application/x-ndjson')
+
+
 class LogoutAPIView(APIView):
     permission_classes = [IsAuthenticated]
 
@@ -91,6 +128,7 @@ class LogoutAPIView(APIView):
 class OrganizationCreateAPIView(APIView):
     permission_classes = [IsAuthenticated]
 
+    @idempotent
     def post(self, request):
         context = {"success": 1, "message": "Organization created successfully", "data": {}}
         try:
@@ -113,12 +151,13 @@ class OrganizationCreateAPIView(APIView):
 
 class OrganizationListAPIView(APIView):
     permission_classes = [IsAuthenticated]
+    renderer_classes = api_settings.DEFAULT_RENDERER_CLASSES + LIST_RENDERER_CLASSES
 
     def get(self, request):
         context = {"success": 1, "message": "Organizations fetched successfully", "data": []}
         try:
-            organizations = Organization.objects.all()
-            serializer = OrganizationSerializer(organizations, many=True)
+            organizations = Organization.objects.order_by('id')
+            serializer = FastOrganizationSerializer(organizations)
             context['data'] = serializer.data
         except Exception as e:
             context['success'] = 0
@@ -146,12 +185,16 @@ class OrganizationUpdateAPIView(APIView):
         context = {"success": 1, "message": "Organization updated successfully", "data": {}}
         try:
             org = Organization.objects.get(id=org_id)
-            if not Member.objects.filter(user=request.user, organization=org, is_admin=True).exists():
+            if not Member.objects.for_organization(org.id).filter(user=request.user, is_admin=True).exists():
                 raise ValidationError("You are not authorized to update this organization.")
 
             serializer = OrganizationSerializer(org, data=request.data, partial=True)
             serializer.is_valid(raise_exception=True)
             updated_org = serializer.save()
+            audit_log.record(
+                AuditEvent.ORGANIZATION_UPDATED, actor=request.user, organization_id=updated_org.id,
+                fields=sorted(serializer.validated_data)
+            )
             context['data'] = OrganizationSerializer(updated_org).data
         except ValidationError as e:
             context['success'] = 0
@@ -184,9 +227,13 @@ class OrganizationDeleteAPIView(APIView):
         context = {"success": 1, "message": "Organization deleted successfully", "data": {}}
         try:
             org = Organization.objects.get(id=org_id)
-            if not Member.objects.filter(user=request.user, organization=org, is_admin=True).exists():
+            if not Member.objects.for_organization(org.id).filter(user=request.user, is_admin=True).exists():
                 raise ValidationError("You are not authorized to delete this organization.")
+            org_id, org_name = org.id, org.name
             org.delete()
+            audit_log.record(
+                AuditEvent.ORGANIZATION_DELETED, actor=request.user, organization_id=org_id, name=org_name
+            )
         except ValidationError as e:
             context['success'] = 0
             context['message'] = e.detail
@@ -203,6 +250,7 @@ class OrganizationDeleteAPIView(APIView):
 class MemberCreateAPIView(APIView):
     permission_classes = [IsAuthenticated]
 
+    @idempotent
     def post(self, request):
         context = {"success": 1, "message": "Member added successfully", "data": {}}
         try:
@@ -210,10 +258,14 @@ class MemberCreateAPIView(APIView):
             serializer.is_valid(raise_exception=True)
 
             org = serializer.validated_data['organization']
-            if not Member.objects.filter(user=request.user, organization=org, is_admin=True).exists():
+            if not Member.objects.for_organization(org.id).filter(user=request.user, is_admin=True).exists():
                 raise ValidationError("Only organization admins can add members.")
 
             member = serializer.save()
+            audit_log.record(
+                AuditEvent.MEMBER_ADDED, actor=request.user, organization_id=member.organization_id,
+                member_id=member.id, user=member.user_id, is_admin=member.is_admin
+            )
             context['data'] = MemberSerializer(member).data
         except ValidationError as e:
             context['success'] = 0
@@ -226,12 +278,13 @@ class MemberCreateAPIView(APIView):
 
 class MemberListAPIView(APIView):
     permission_classes = [IsAuthenticated]
+    renderer_classes = api_settings.DEFAULT_RENDERER_CLASSES + LIST_RENDERER_CLASSES
 
     def get(self, request):
         context = {"success": 1, "message": "Members fetched successfully", "data": []}
         try:
-            members = Member.objects.all()
-            serializer = MemberSerializer(members, many=True)
+            members = Member.objects.order_by('id').on_each_shard()
+            serializer = FastMemberSerializer(members)
             context['data'] = serializer.data
         except Exception as e:
             context['success'] = 0
@@ -245,7 +298,7 @@ class MemberUpdateAPIView(APIView):
     def get(self, request, member_id):
         context = {"success": 1, "message": "Member fetched successfully", "data": {}}
         try:
-            member = Member.objects.get(id=member_id)
+            member = Member.objects.get_from_any_shard(id=member_id)
             context['data'] = MemberSerializer(member).data
         except Member.DoesNotExist:
             context['success'] = 0
@@ -258,13 +311,17 @@ class MemberUpdateAPIView(APIView):
     def put(self, request, member_id):
         context = {"success": 1, "message": "Member updated successfully", "data": {}}
         try:
-            member = Member.objects.get(id=member_id)
-            if not Member.objects.filter(user=request.user, organization=member.organization, is_admin=True).exists():
+            member = Member.objects.get_from_any_shard(id=member_id)
+            if not Member.objects.for_organization(member.organization_id).filter(user=request.user, is_admin=True).exists():
                 raise ValidationError("Only organization admins can update members.")
 
             serializer = MemberSerializer(member, data=request.data, partial=True)
             serializer.is_valid(raise_exception=True)
             updated_member = serializer.save()
+            audit_log.record(
+                AuditEvent.MEMBER_UPDATED, actor=request.user, organization_id=updated_member.organization_id,
+                member_id=updated_member.id, fields=sorted(serializer.validated_data)
+            )
             context['data'] = MemberSerializer(updated_member).data
         except ValidationError as e:
             context['success'] = 0
@@ -284,7 +341,7 @@ class MemberDeleteAPIView(APIView):
     def get(self, request, member_id):
         context = {"success": 1, "message": "Member fetched successfully", "data": {}}
         try:
-            member = Member.objects.get(id=member_id)
+            member = Member.objects.get_from_any_shard(id=member_id)
             context['data'] = MemberSerializer(member).data
         except Member.DoesNotExist:
             context['success'] = 0
@@ -297,10 +354,15 @@ class MemberDeleteAPIView(APIView):
     def delete(self, request, member_id):
         context = {"success": 1, "message": "Member removed successfully", "data": {}}
         try:
-            member = Member.objects.get(id=member_id)
-            if not Member.objects.filter(user=request.user, organization=member.organization, is_admin=True).exists():
+            member = Member.objects.get_from_any_shard(id=member_id)
+            if not Member.objects.for_organization(member.organization_id).filter(user=request.user, is_admin=True).exists():
                 raise ValidationError("Only organization admins can remove members.")
+            member_id, org_id, user_id = member.id, member.organization_id, member.user_id
             member.delete()
+            audit_log.record(
+                AuditEvent.MEMBER_REMOVED, actor=request.user, organization_id=org_id,
+                member_id=member_id, user=user_id
+            )
         except ValidationError as e:
             context['success'] = 0
             context['message'] = e.detail
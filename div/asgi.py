@@ -14,3 +14,9 @@ from django.core.asgi import get_asgi_application
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'div.settings')
 
 application = get_asgi_application()
+
+from div.warmup import warm_up  # noqa: E402  (needs the app registry loaded above)
+
+# Sync views run on executor threads and Django connections are per thread,
+# so a connection opened here would never be reused; only pay the driver setup.
+warm_up(keep_db_open=False)
@@ -45,6 +45,8 @@ INSTALLED_APPS = [
 
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
+    'authentication.middleware.LargeResponseGZipMiddleware',
+    'authentication.profiling.ProfilingMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
@@ -80,6 +82,42 @@ DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.sqlite3',
         'NAME': BASE_DIR / 'db.sqlite3',
+        # Keep connections across requests so the one opened during worker
+        # warm-up is actually reused.
+        'CONN_MAX_AGE': 60,
+        'CONN_HEALTH_CHECKS': True,
+    },
+    # Member shards (see authentication/routers.py). Only aliases listed in
+    # MEMBER_SHARDS receive rows; the others just need to exist to be used.
+    'members_0': {
+        'ENGINE': 'django.db.backends.sqlite3',
+        'NAME': BASE_DIR / 'members_0.sqlite3',
+        'CONN_MAX_AGE': 60,
+        'CONN_HEALTH_CHECKS': True,
+    },
+    'members_1': {
+        'ENGINE': 'django.db.backends.sqlite3',
+        'NAME': BASE_DIR / 'members_1.sqlite3',
+        'CONN_MAX_AGE': 60,
+        'CONN_HEALTH_CHECKS': True,
+    },
+}
+
+DATABASE_ROUTERS = ['authentication.routers.MemberShardRouter']
+
+# Databases holding Member rows, picked by organization_id % len(MEMBER_SHARDS).
+# Run `manage.py migrate --database <alias>` for each new alias and then
+# `manage.py rebalance_members` after changing this list.
+MEMBER_SHARDS = ['default']
+
+
+# Cache
+# Throttle counters live here; point this at Redis or Memcached in production
+# so limits are shared between workers.
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
     }
 }
 
@@ -128,7 +166,17 @@ DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': (
         'rest_framework_simplejwt.authentication.JWTAuthentication',
-    )
+    ),
+    'EXCEPTION_HANDLER': 'authentication.throttling.exception_handler',
+    # Trust REMOTE_ADDR only; set to the number of reverse proxies when
+    # deployed behind them so X-Forwarded-For cannot be spoofed.
+    'NUM_PROXIES': 0,
+    'DEFAULT_THROTTLE_RATES': {
+        'login_ip': '30/min',
+        'login_email': '5/min',
+        'signup_ip': '10/hour',
+        'signup_email': '3/hour',
+    },
 }
 
 SIMPLE_JWT = {
@@ -141,4 +189,33 @@ SIMPLE_JWT = {
     "TOKEN_BLACKLIST_SERIALIZER": "rest_framework_simplejwt.serializers.TokenBlacklistSerializer",
 }
 
-AUTH_USER_MODEL = 'authentication.CustomUser'
\ No newline at end of file
+AUTH_USER_MODEL = 'authentication.CustomUser'
+
+# Run div/warmup.py when a WSGI/ASGI worker boots
+WARMUP_ON_STARTUP = True
+
+# Buffered audit log (see authentication/audit.py)
+AUDIT_LOG = {
+    'BATCH_SIZE': 100,
+    'FLUSH_INTERVAL': 2.0,
+    # Oldest events are dropped past this while the database is unreachable
+    'MAX_PENDING': 1000,
+}
+
+# Idempotency-Key handling for create endpoints (see authentication/idempotency.py)
+IDEMPOTENCY = {
+    'TTL': 24 * 60 * 60,
+    'LOCK_TIMEOUT': 60,
+    'WAIT_TIMEOUT': 10,
+}
+
+# Responses smaller than this are sent uncompressed
+GZIP_MIN_LENGTH = 1024
+
+# Per-request profiling for staff (see authentication/profiling.py)
+PROFILING = {
+    'BUFFER_SIZE': 50,
+    'TOKEN_MAX_AGE': 60 * 60,
+    'STATS_LIMIT': 40,
+    'MAX_QUERIES': 500,
+}
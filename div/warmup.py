@@ -0,0 +1,123 @@
+"""
+Worker warm-up for div project.
+
+A fresh worker pays several one-off costs on its first request: compiling
+the URL resolver, building DRF serializer fields, importing the simplejwt
+settings and PyJWT, loading the password hashers and opening the database
+connection. ``warm_up()`` runs them at boot instead, from div/wsgi.py and
+div/asgi.py.
+
+Under ``gunicorn --preload`` the application is imported once in the master
+and forked, so a database connection opened there would be shared by every
+worker. gunicorn.conf.py closes the master's connections in ``pre_fork``,
+after the preload and before any worker exists, and each worker connects
+from ``post_worker_init``.
+"""
+
+import logging
+import re
+import time
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, connections
+from django.urls import URLPattern, URLResolver, get_resolver, resolve
+
+logger = logging.getLogger(__name__)
+
+
+def iter_endpoints(patterns=None, prefix=''):
+    """
+    Yields (name, path, view_class) for every project URL pattern served by
+    a DRF APIView. Path converters are filled with 0.
+    """
+    from rest_framework.views import APIView
+
+    if patterns is None:
+        patterns = get_resolver().url_patterns
+    for pattern in patterns:
+        route = prefix + str(pattern.pattern)
+        if isinstance(pattern, URLResolver):
+            yield from iter_endpoints(pattern.url_patterns, route)
+        elif isinstance(pattern, URLPattern):
+            view_class = getattr(pattern.callback, 'view_class', None)
+            if view_class is not None and issubclass(view_class, APIView):
+                yield pattern.name, '/' + re.sub(r'<[^>]+>', '0', route), view_class
+
+
+def warm_up_urls():
+    for name, route, view_class in iter_endpoints():
+        resolve(route)
+
+
+def warm_up_serializers():
+    from rest_framework.serializers import BaseSerializer
+    from authentication import serializers
+
+    for value in vars(serializers).values():
+        if isinstance(value, type) and issubclass(value, BaseSerializer) and hasattr(value, 'Meta'):
+            value().fields
+
+
+def warm_up_views():
+    # APIView resolves its renderer, parser and authentication classes
+    # lazily from DRF settings on first use.
+    for name, route, view_class in iter_endpoints():
+        view = view_class()
+        view.get_renderers()
+        view.get_parsers()
+        view.get_authenticators()
+        view.get_permissions()
+
+
+def warm_up_jwt():
+    from rest_framework_simplejwt.tokens import AccessToken
+
+    # Round-tripping a token imports the token classes and backend from
+    # SIMPLE_JWT and primes PyJWT's algorithm tables.
+    AccessToken(str(AccessToken()))
+
+
+def warm_up_hashers():
+    from django.contrib.auth.hashers import get_hashers
+
+    get_hashers()
+
+
+def warm_up_database(keep_open=True):
+    from authentication.routers import member_shards
+
+    for alias in dict.fromkeys([DEFAULT_DB_ALIAS, *member_shards()]):
+        connection = connections[alias]
+        connection.ensure_connection()
+        if not keep_open:
+            connection.close()
+
+
+STEPS = (
+    ('urls', warm_up_urls),
+    ('serializers', warm_up_serializers),
+    ('views', warm_up_views),
+    ('jwt', warm_up_jwt),
+    ('hashers', warm_up_hashers),
+)
+
+
+def warm_up(keep_db_open=True):
+    """
+    Runs every warm-up step and returns {step: seconds}. Failures are logged
+    and never prevent the worker from starting.
+    """
+    if not getattr(settings, 'WARMUP_ON_STARTUP', False):
+        return {}
+
+    steps = STEPS + (('database', lambda: warm_up_database(keep_open=keep_db_open)),)
+    timings = {}
+    for name, step in steps:
+        start = time.perf_counter()
+        try:
+            step()
+        except Exception:
+            logger.exception("Warm-up step %r failed", name)
+        timings[name] = time.perf_counter() - start
+    logger.info("Worker warm-up finished: %s", ", ".join(f"{k}={v * 1000:.1f}ms" for k, v in timings.items()))
+    return timings
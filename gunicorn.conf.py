@@ -0,0 +1,28 @@
+"""
+Gunicorn hooks for div project.
+
+Usage: gunicorn -c gunicorn.conf.py div.wsgi [--preload]
+"""
+
+wsgi_app = 'div.wsgi:application'
+
+
+def pre_fork(server, worker):
+    # With --preload div.wsgi (and its warm-up) ran in the master, which is
+    # left holding database connections. Close them so no worker inherits one.
+    if server.cfg.preload_app:
+        from django.db import connections
+
+        connections.close_all()
+
+
+def post_worker_init(worker):
+    from div.warmup import warm_up_database
+
+    warm_up_database()
+
+
+def worker_exit(server, worker):
+    from authentication.audit import audit_log
+
+    audit_log.flush()